@@ -29,6 +29,16 @@ def build():
     if icon_path:
         cmd.append(f"--icon={icon_path}")
     
+    # Smaller bundle = faster self-extraction on every launch of the --onefile exe.
+    # UPX-compressed binaries must be decompressed at startup, so skip UPX.
+    cmd.append("--noupx")
+    # Strip symbol tables (not supported for Windows binaries)
+    if sys.platform != "win32":
+        cmd.append("--strip")
+    # Standard-library modules ForgeOAgent never imports
+    for module in ("tkinter", "unittest", "test", "pydoc_data"):
+        cmd.append(f"--exclude-module={module}")
+    
     # Add data files (format: source;destination)
     # mcp and web are essential for system prompts and the web interface
     cmd.extend([
@@ -1,12 +1,27 @@
-from .clients import GeminiAPIClient
-from .controller import create_master_executor
+import os
+import atexit
+import importlib
+
 from .core import PyClassAnalyzer
 from .config import config
 
-from .main import main
+# GeminiAPIClient and friends pull in google.genai, so they are imported on first access (PEP 562)
+_LAZY_EXPORTS = {
+    "GeminiAPIClient": ".clients",
+    "create_master_executor": ".controller",
+    "main": ".main",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Importing .main binds the submodule on the package; rebind the exported name
+    globals()[name] = value
+    return value
 
-import os
-import atexit
 
 SECURITY_ENABLED = os.getenv('SECURITY_ENABLED', 'False') == 'True' or os.getenv('SECURITY_ENABLED', 'False') == 'true' or os.getenv('SECURITY_ENABLED', 'False') == '1'
 if SECURITY_ENABLED:
@@ -17,8 +17,7 @@ load_dotenv()
 current_dir = Path(__file__).parent.resolve()
 sys.path.insert(0, str(current_dir))
 
-# Import after path setup
-from forgeoagent.clients.gemini_engine import GeminiAPIClient
+# Import after path setup (google.genai is only loaded by commands that call the API)
 from forgeoagent.controller.executor_controller import (
     print_available_executors,
     save_last_executor,
@@ -0,0 +1,129 @@
+import asyncio
+from typing import Dict, List, Any, AsyncIterator
+
+from forgeoagent.config import DEFAULT_MODEL
+from forgeoagent.core.helpers import json_dumps, run_coroutine_sync
+from forgeoagent.clients.gemini_engine import GeminiAPIClient
+
+
+def _topological_order(ids: List[str], by_id: Dict[str, Dict[str, Any]]) -> tuple:
+    """Order task ids so dependencies come first; returns ``(order, {task_id: error})``.
+
+    Tasks with unknown dependencies or in a dependency cycle are reported as errors.
+    """
+    errors: Dict[str, str] = {}
+    waiting: Dict[str, set] = {}
+    for task_id in dict.fromkeys(ids):
+        depends_on = by_id[task_id].get("depends_on") or []
+        unknown = [dep for dep in depends_on if dep not in by_id]
+        if unknown:
+            errors[task_id] = f"Unknown dependency: {', '.join(unknown)}"
+        waiting[task_id] = {dep for dep in depends_on if dep in by_id}
+
+    order: List[str] = []
+    ready = [task_id for task_id, deps in waiting.items() if not deps]
+    for task_id in ready:
+        del waiting[task_id]
+    while ready:
+        done = ready.pop(0)
+        order.append(done)
+        for task_id, deps in list(waiting.items()):
+            deps.discard(done)
+            if not deps:
+                del waiting[task_id]
+                ready.append(task_id)
+
+    for task_id in waiting:
+        errors.setdefault(task_id, "Circular dependency")
+        order.append(task_id)
+    return order, errors
+
+
+def _with_dependency_results(prompt: str, results: Dict[str, Any]) -> str:
+    """Append the responses of finished dependencies to a sub-agent prompt."""
+    blocks = [f'<dependency id="{task_id}">{json_dumps(result)}</dependency>' for task_id, result in results.items()]
+    return "\n".join([prompt, *blocks])
+
+
+async def run_batch(tasks: List[Dict[str, Any]], system_instruction: str = None, model: str = DEFAULT_MODEL, max_inflight: int = 16) -> AsyncIterator[Dict[str, Any]]:
+    """Run sub-agent tasks concurrently and yield results as they arrive.
+
+    Each task is a dict with ``id`` and ``prompt``, an optional ``system_instruction``
+    (defaults to the shared ``system_instruction``) and an optional ``depends_on`` list
+    of task ids. A task starts once its dependencies finished and gets their responses
+    appended to its prompt; independent tasks run at the same time. Tasks with the same
+    prompt, instruction and dependencies are sent once and share the result. Yields
+    ``{"id", "result"}`` or ``{"id", "error"}`` dicts in completion order.
+
+    Raises ValueError before anything is sent when two tasks share an id.
+    """
+    semaphore = asyncio.Semaphore(max_inflight)
+    ids = [task.get("id") or f"task_{index}" for index, task in enumerate(tasks)]
+    duplicates = sorted({task_id for task_id in ids if ids.count(task_id) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate task ids: {', '.join(duplicates)}")
+    by_id = dict(zip(ids, tasks))
+    order, errors = _topological_order(ids, by_id)
+    pending: Dict[tuple, asyncio.Task] = {}
+    futures: Dict[str, asyncio.Task] = {}
+
+    async def _run(task: Dict[str, Any], dependencies: Dict[str, asyncio.Task]) -> Dict[str, Any]:
+        results = {}
+        for dep_id, dependency in dependencies.items():
+            try:
+                results[dep_id] = await dependency
+            except Exception as e:
+                raise RuntimeError(f"Dependency {dep_id} failed: {e}") from e
+        prompt = _with_dependency_results(task["prompt"], results) if results else task["prompt"]
+        async with semaphore:
+            client = GeminiAPIClient(
+                system_instruction=task.get("system_instruction") or system_instruction,
+                model=model,
+                conversation_id=task.get("id"),
+                new_content=True
+            )
+            return await client.agenerate_content(prompt)
+
+    async def _fail(error: str) -> Dict[str, Any]:
+        raise ValueError(error)
+
+    async def _labelled(task_id: str, shared: asyncio.Task) -> Dict[str, Any]:
+        try:
+            return {"id": task_id, "result": await shared}
+        except Exception as e:
+            return {"id": task_id, "error": str(e)}
+
+    for task_id in order:
+        if task_id in errors:
+            futures[task_id] = asyncio.ensure_future(_fail(errors[task_id]))
+            continue
+        task = by_id[task_id]
+        depends_on = tuple(task.get("depends_on") or ())
+        key = (task["prompt"], task.get("system_instruction") or system_instruction, depends_on)
+        if key not in pending:
+            pending[key] = asyncio.ensure_future(_run(task, {dep: futures[dep] for dep in depends_on}))
+        futures[task_id] = pending[key]
+
+    labelled = [asyncio.ensure_future(_labelled(task_id, futures[task_id])) for task_id in ids]
+    try:
+        for finished in asyncio.as_completed(labelled):
+            yield await finished
+    finally:
+        # The caller may stop iterating early (break, aclose, cancellation); stop the remaining requests
+        for task in (*labelled, *futures.values()):
+            if not task.done():
+                task.cancel()
+
+
+def run_batch_sync(tasks: List[Dict[str, Any]], system_instruction: str = None, model: str = DEFAULT_MODEL, max_inflight: int = 16) -> Dict[str, Any]:
+    """Run ``run_batch`` to completion and return ``{task_id: response_or_error}``."""
+    async def _collect() -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        async for item in run_batch(tasks, system_instruction=system_instruction, model=model, max_inflight=max_inflight):
+            status = "✅" if "result" in item else "❌"
+            print(f"{status} Subtask finished: {item['id']}")
+            results[item["id"]] = item.get("result", {"error": item.get("error")})
+        return results
+
+    # Runs on the shared background loop, where the cached Gemini clients stay usable between batches
+    return run_coroutine_sync(_collect())
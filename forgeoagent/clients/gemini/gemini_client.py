@@ -0,0 +1,33 @@
+import asyncio
+import functools
+import threading
+import weakref
+from typing import TYPE_CHECKING, Dict
+
+if TYPE_CHECKING:
+    from google import genai
+
+
+@functools.lru_cache(maxsize=16)
+def get_genai_client(api_key: str) -> "genai.Client":
+    """Return a shared genai.Client for ``api_key`` so its HTTP session stays warm between requests."""
+    from google import genai
+    return genai.Client(api_key=api_key)
+
+
+# Clients for ``.aio`` calls, one set per event loop: the async HTTP session (httpx or aiohttp)
+# is bound to the loop it first ran on and fails once that loop is closed
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, genai.Client]]" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+
+def get_async_genai_client(api_key: str) -> "genai.Client":
+    """Return the genai.Client for ``api_key`` to use for ``.aio`` calls on the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(api_key)
+        if client is None:
+            from google import genai
+            client = clients[api_key] = genai.Client(api_key=api_key)
+        return client
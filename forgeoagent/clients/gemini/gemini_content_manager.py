@@ -1,84 +1,217 @@
 import os
-import json
 import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
 from google.genai import types
 
 from forgeoagent.config import (
-    LOG_DIR
+    MAIN_AGENT_LOG_DIR,
+    AGENT_LOG_DIR
 )
+from forgeoagent.core.helpers import json_dumps, json_dumps_bytes, json_loads
+from .gemini_logger import GeminiLogger
+
+# Interned history messages: identical (role, text) pairs share one Content object
+_content_intern: "weakref.WeakValueDictionary[tuple, types.Content]" = weakref.WeakValueDictionary()
+
+
+def _make_content(role: str, text: str) -> types.Content:
+    key = (role, text)
+    content = _content_intern.get(key)
+    if content is None:
+        content = types.Content(role=role, parts=[types.Part.from_text(text=text)])
+        _content_intern[key] = content
+    return content
+
 
 class GeminiContentManager:
     @staticmethod
     def _get_last_conversation_id(type:str = "inquirer") -> Optional[str]:
         """Gets the most recent conversation ID from the 'logs' directory."""
-        logs_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","..", "logs", type))
+        logs_dir = MAIN_AGENT_LOG_DIR if type == "executor" else AGENT_LOG_DIR
         if not os.path.isdir(logs_dir):
             return None
+        GeminiLogger._flush_logs()
         
-        log_files = [f for f in os.listdir(logs_dir) if f.endswith('.jsonl') and f.startswith(f'{type}_')]
-        if not log_files:
-            return None
-        
+        prefix = f'{type}_'
         try:
-            full_paths = [os.path.join(logs_dir, f) for f in log_files]
-            latest_file = max(full_paths, key=os.path.getmtime)
-            return os.path.basename(latest_file)[:-6]  # Remove .jsonl
+            with os.scandir(logs_dir) as it:
+                latest = max(
+                    (e for e in it if e.name.endswith('.jsonl') and e.name.startswith(prefix)),
+                    key=lambda e: e.stat().st_mtime,
+                    default=None,
+                )
         except (ValueError, FileNotFoundError):
             return None
+        return None if latest is None else latest.name[:-6]  # Remove .jsonl
     
     
     
+    def _read_log_tail(self, log_file: str, parse_line) -> list:
+        """Return the Gemini contents parsed from ``log_file``.
+
+        Results are cached per instance by file size/mtime; when the (append-only)
+        log grows only the new bytes are read and parsed. A file that changed without
+        growing was rewritten, so it is read again from the start.
+        """
+        cache = self._conv_cache
+        try:
+            st = os.stat(log_file)
+        except OSError:
+            return []
+        size, mtime, pos, contents = cache.get(log_file, (0, 0, 0, None))
+        if contents is not None and size == st.st_size and mtime == st.st_mtime:
+            return contents
+        if contents is None or st.st_size <= size or st.st_size < pos:
+            pos, contents = 0, []
+        with open(log_file, 'rb') as f:
+            f.seek(pos)
+            data = f.read()
+        # Leave an incomplete trailing line for the next read
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                parse_line(json_loads(line), contents)
+            except Exception:
+                continue
+        cache[log_file] = (st.st_size, st.st_mtime, pos + end, contents)
+        return contents
+
+    @staticmethod
+    def _parse_reference_line(data, contents: list) -> None:
+        # Add as a system or user message (customize as needed)
+        if isinstance(data, dict) and data.get('type') == 'interaction':
+            text = data.get('input', None)
+            if text is not None:
+                contents.append(_make_content("user", text))
+            assistant_text = data.get('response', None)
+            if assistant_text is not None:
+                if isinstance(assistant_text, dict):
+                    assistant_text = json_dumps(assistant_text)
+                contents.append(_make_content("model", str(assistant_text)))
+
+    @staticmethod
+    def _parse_conversation_line(data, contents: list) -> None:
+        if data.get('type') == 'interaction' and 'input' in data:
+            text = data['input']
+            contents.append(_make_content("user", text))
+            assistant_text = data.get('response', None)
+            if assistant_text:
+                if isinstance(assistant_text, dict):
+                    assistant_text = json_dumps(assistant_text)
+                contents.append(_make_content("model", str(assistant_text)))
+
     def _get_referenced_agent_json_contents(self, reference_folder: str) -> list:
         """Read all JSONL files in the reference folder and return as Gemini contents."""
-        import glob
         contents = []
         if reference_folder and os.path.isdir(reference_folder):
-            for file in glob.glob(os.path.join(reference_folder, '*.jsonl')):
-                with open(file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        try:
-                            data = json.loads(line)
-                            # Add as a system or user message (customize as needed)
-                            if isinstance(data, dict) and data.get('type') == 'interaction':
-                                text = data.get('input', None)
-                                if text is not None:
-                                    contents.append(types.Content(role="user", parts=[types.Part.from_text(text=text)]))
-                                assistant_text = data.get('response', None)
-                                if assistant_text is not None:
-                                    if isinstance(assistant_text, dict):
-                                        assistant_text = json.dumps(assistant_text, ensure_ascii=False)
-                                    contents.append(types.Content(role="model", parts=[types.Part.from_text(text=str(assistant_text))]))
-                        except Exception:
-                            continue
+            with os.scandir(reference_folder) as it:
+                files = [e.path for e in it if e.name.endswith('.jsonl') and not e.name.startswith('.')]
+            if len(files) > 1:
+                # Overlap the file reads; results keep the listing order
+                with ThreadPoolExecutor(max_workers=min(8, len(files))) as ex:
+                    per_file = list(ex.map(lambda file: self._read_log_tail(file, self._parse_reference_line), files))
+            else:
+                per_file = [self._read_log_tail(file, self._parse_reference_line) for file in files]
+            for sub in per_file:
+                contents.extend(sub)
         return contents
 
-    def _get_previous_conversation_contents(self,type:str = "inquirer") -> list:
+    def _get_previous_conversation_contents(self,type:str = "inquirer", window: bool = True) -> list:
         """Read previous conversation from the current log file and return as Gemini contents."""
-        contents = []
         last_id = self._get_last_conversation_id(type)
         self.conversation_id = last_id or self.conversation_id or f"{type}_{datetime.now().strftime("%Y%m%d_%H%M%S")}_{uuid.uuid4().hex[:8]}"
-        self.log_file = f"{LOG_DIR}/{type}/{self.conversation_id}.jsonl"
+        self.log_file = os.path.join(MAIN_AGENT_LOG_DIR if type == "executor" else AGENT_LOG_DIR, f"{self.conversation_id}.jsonl")
 
         if os.path.exists(self.log_file):
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        data = json.loads(line)
-                        if data.get('type') == 'interaction' and 'input' in data:
-                            text = data['input']
-                            contents.append(types.Content(role="user", parts=[types.Part.from_text(text=text)]))
-                            assistant_text = data.get('response', None)
-                            if assistant_text:
-                                if isinstance(assistant_text, dict):
-                                    assistant_text = json.dumps(assistant_text, ensure_ascii=False)
-                                contents.append(types.Content(role="model", parts=[types.Part.from_text(text=str(assistant_text))]))
-                    except Exception:
-                        continue
-        return contents
+            GeminiLogger._flush_logs()
+            contents = self._read_log_tail(self.log_file, self._parse_conversation_line)
+            return self._window_history(contents) if window else list(contents)
+        return []
+
+    def _record_turn(self, history: list, user_msg: types.Content, model_text: Optional[str]) -> None:
+        """Append a completed turn to ``history``; failed turns are never recorded.
+
+        A turn without model text counts as failed: recording the user message alone
+        would put two user turns in a row. Without ``summarize_history`` only the last
+        ``max_history_turns`` turns are ever sent, so older ones are dropped from memory
+        once the list reaches twice the window.
+        """
+        if not model_text:
+            return
+        history.extend((user_msg, types.Content(role="model", parts=[types.Part.from_text(text=model_text)])))
+        max_turns = getattr(self, "max_history_turns", None)
+        if max_turns and not getattr(self, "summarize_history", False) and len(history) > 4 * max_turns:
+            del history[:-2 * max_turns]
+
+    def _window_history(self, contents: list) -> list:
+        """Keep only the last ``max_history_turns`` user/model pairs of ``contents``.
+
+        With ``summarize_history`` enabled the dropped head is replaced by a single
+        summary message. The summary is refreshed every ``max_history_turns`` turns,
+        so between one and two windows of raw turns are sent.
+        """
+        max_turns = getattr(self, "max_history_turns", None)
+        if not max_turns or len(contents) <= 2 * max_turns:
+            return list(contents)
+        window = 2 * max_turns
+        if not getattr(self, "summarize_history", False):
+            return contents[-window:]
+
+        summarized = (len(contents) - window) // window * window
+        if summarized == 0:
+            return list(contents)
+        summary = self._get_history_summary(contents[:summarized])
+        if summary is None:
+            return contents[-window:]
+        return [types.Content(role="user", parts=[types.Part.from_text(text=f"Summary of the earlier conversation:\n{summary}")])] + contents[summarized:]
 
+    def _get_history_summary(self, head: list) -> Optional[str]:
+        """Summarize ``head`` once and persist it next to the log file."""
+        log_file = getattr(self, "log_file", None)
+        summary_file = f"{log_file[:-len('.jsonl')]}.summary.json" if log_file else None
+        cached = self.__dict__.get("_history_summary")
+        if cached is None and summary_file and os.path.exists(summary_file):
+            try:
+                with open(summary_file, 'rb') as f:
+                    cached = json_loads(f.read())
+            except Exception:
+                cached = None
+        if cached and cached.get("count") == len(head):
+            self._history_summary = cached
+            return cached["summary"]
+
+        transcript = "\n".join(f"{c.role}: {c.parts[0].text}" for c in head if c.parts and c.parts[0].text)
+        try:
+            from forgeoagent.core.managers.api_key_manager import GlobalAPIKeyManager
+            from .gemini_client import get_genai_client
+            client = get_genai_client(GlobalAPIKeyManager.get_current_key())
+            response = client.models.generate_content(
+                model=self.model,
+                contents=[types.Content(role="user", parts=[types.Part.from_text(
+                    text=f"Summarize the following {len(head) // 2} conversation turns. Keep every decision, fact, file name and code detail needed to continue the conversation.\n\n{transcript}"
+                )])],
+                config=types.GenerateContentConfig(response_mime_type="text/plain")
+            )
+            summary = response.text
+        except Exception as e:
+            print(f"[!] Failed to summarize conversation history: {e}")
+            return None
+        if not summary:
+            return None
+
+        self._history_summary = {"count": len(head), "summary": summary}
+        if summary_file is None:
+            return summary
+        try:
+            with open(summary_file, 'wb') as f:
+                f.write(json_dumps_bytes(self._history_summary))
+        except OSError:
+            pass
+        return summary
 
 if __name__ == "__main__":
     manager = GeminiContentManager()._get_referenced_agent_json_contents("/home/userpc/29/ForgeOAgent/forgeoagent/logs/inquirer")
@@ -1,126 +1,257 @@
 import os
-import json
+import asyncio
+import hashlib
+import itertools
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
-from google import genai
 
-from forgeoagent.core.managers.api_key_manager import GlobalAPIKeyManager
-
-from forgeoagent.config import (
-    DEFAULT_SYSTEM_INSTRUCTION,
-)
+from forgeoagent.core.helpers import json_dumps, json_loads, JSONDecodeError
+from .gemini_client import get_async_genai_client, get_genai_client
+from .gemini_response_cache import GeminiResponseCache
+from .gemini_prompt_cache import get_cached_content_name, invalidate_cached_content
+from .gemini_retry import GeminiRetryMixin
 
 from google.genai import types
-from google.api_core.exceptions import Unauthenticated, ResourceExhausted, GoogleAPICallError
 
-class GeminiExecutor:
-    def generate_content(self, prompt: str, max_retries: int = 3, previous_conversation_log: bool = True,system_instruction:str = None) -> Dict[str, Any]:
-        """Make API call with error handling and retry logic."""
-        
+# Response schemas and generation configs shared by clients with the same settings (LRUs, guarded by one lock)
+_GENERATE_CONFIG_CACHE_SIZE = 32
+_response_schemas: "OrderedDict[tuple, tuple]" = OrderedDict()
+_schema_keys: "OrderedDict[int, tuple]" = OrderedDict()
+_generate_configs: "OrderedDict[tuple, tuple]" = OrderedDict()
+_generate_configs_lock = threading.Lock()
+
+
+def _remember(cache: "OrderedDict", key: Any, entry: tuple) -> tuple:
+    """Store ``entry`` as the newest item of ``cache``, dropping the oldest past the size limit (call with the lock held)."""
+    cache[key] = entry
+    cache.move_to_end(key)
+    if len(cache) > _GENERATE_CONFIG_CACHE_SIZE:
+        cache.popitem(last=False)
+    return entry
+
+class GeminiExecutor(GeminiRetryMixin):
+    def _response_schema(self) -> types.Schema:
+        """Return the OBJECT schema for this client's output, built once per (required, properties) pair."""
+        key = (tuple(self.output_required), id(self.output_properties))
+        with _generate_configs_lock:
+            entry = _response_schemas.get(key)
+            # ids are only trusted while the cached entry still holds the very same object
+            if entry is not None and entry[0] is self.output_properties:
+                _response_schemas.move_to_end(key)
+                return entry[1]
+        schema = types.Schema(
+            type=types.Type.OBJECT,
+            required=self.output_required,
+            properties=self.output_properties
+        )
+        with _generate_configs_lock:
+            return _remember(_response_schemas, key, (self.output_properties, schema))[1]
+
+    def _response_schema_key(self) -> str:
+        """Stable fingerprint of the response schema (required fields and properties), built once per schema."""
+        schema = self._response_schema()
+        with _generate_configs_lock:
+            entry = _schema_keys.get(id(schema))
+            if entry is not None and entry[0] is schema:
+                _schema_keys.move_to_end(id(schema))
+                return entry[1]
+        dumped = schema.model_dump_json(exclude_none=True)
+        with _generate_configs_lock:
+            return _remember(_schema_keys, id(schema), (schema, hashlib.sha256(dumped.encode("utf-8")).hexdigest()))[1]
+
+    def _build_generate_config(self, system_instruction_part: Optional[list], cached_content: Optional[str] = None) -> types.GenerateContentConfig:
+        """Build the JSON-schema generation config used by generate_content."""
+        return types.GenerateContentConfig(
+            safety_settings=self.safety_settings,
+            response_mime_type="application/json",
+            response_schema=self._response_schema(),
+            system_instruction=system_instruction_part,
+            cached_content=cached_content
+        )
+
+    def _shared_generate_config(self, cached_content: Optional[str] = None) -> types.GenerateContentConfig:
+        """Return the client's default generate config, reusing one built by an equivalent client."""
+        key = (tuple(self.output_required), id(self.output_properties), id(self.safety_settings), self._system_instruction_key, cached_content)
+        with _generate_configs_lock:
+            entry = _generate_configs.get(key)
+            # ids are only trusted while the cached entry still holds the very same objects
+            if entry is not None and entry[0] is self.output_properties and entry[1] is self.safety_settings:
+                _generate_configs.move_to_end(key)
+                return entry[2]
+
+        if cached_content is None:
+            config = self._build_generate_config(self._system_instruction_part)
+        else:
+            config = self._build_generate_config(None, cached_content=cached_content)
+        with _generate_configs_lock:
+            _remember(_generate_configs, key, (self.output_properties, self.safety_settings, config))
+        return config
+
+    def _custom_generate_config(self, system_instruction: str) -> types.GenerateContentConfig:
+        """Config for a per-call system instruction; the last one is kept since callers tend to repeat it."""
+        cached = self._custom_generate_config_cache
+        if cached is not None and cached[0] == system_instruction:
+            return cached[1]
+        config = self._build_generate_config([types.Part.from_text(text=system_instruction.strip())])
+        self._custom_generate_config_cache = (system_instruction, config)
+        return config
+
+    def _config_for_key(self, api_key: str, request: Dict[str, Any]) -> types.GenerateContentConfig:
+        """Return the request config, switched to the cached system instruction when prompt caching is on.
+
+        Cached content belongs to the API key that created it, so the handle is resolved per key.
+        """
+        if not self.cached_content or request["custom_instruction"]:
+            return request["config"]
+        cache_name = get_cached_content_name(get_genai_client(api_key), api_key, self.model, self._system_instruction_part, self._system_instruction_key)
+        if cache_name is None:
+            return request["config"]
+        return self._shared_generate_config(cache_name)
+
+    def _drop_stale_cached_content(self, api_key: str, request: Dict[str, Any], error: Exception) -> bool:
+        """Return True (and forget the handle) when ``error`` means the cached content expired or vanished."""
+        if not self.cached_content or request["custom_instruction"]:
+            return False
+        if "cachedcontent" not in str(error).lower().replace(" ", ""):
+            return False
+        invalidate_cached_content(api_key, self.model, self._system_instruction_key)
+        print(f"🔄 Cached system instruction expired, recreating it. Request from #{self.conversation_id}")
+        return True
+
+    def _prepare_generate(self, prompt: str, previous_conversation_log: bool, system_instruction: Optional[str]) -> Dict[str, Any]:
+        """Build everything a generate call needs; ``cached`` is set when the response cache already has an answer."""
         if system_instruction is not None:
-            system_instruction = system_instruction.strip()
-        elif system_instruction is None and self.system_instruction is not None:
-            system_instruction = DEFAULT_SYSTEM_INSTRUCTION + "\n\n" + self.system_instruction
+            generate_config = self._custom_generate_config(system_instruction)
         else:
-            system_instruction = DEFAULT_SYSTEM_INSTRUCTION
+            generate_config = self._generate_config
         
         self.request_count += 1
-        manager = GlobalAPIKeyManager()
-
-        # Build request contents
-        contents = []
-        # 1. Add reference JSON contents if provided
-        if self.reference_json:
-            contents.extend(self._get_referenced_agent_json_contents(self.reference_json))
-        # 2. Add previous conversation
-        if previous_conversation_log and not self.new_content:
-            contents.extend(self._get_previous_conversation_contents('executor'))
-        
-        # 3. Add current conversation prompts
-        contents.extend(self._contents)
+
+        # self._contents is the conversation history: the previous conversation
+        # is loaded from disk once, later turns are appended in memory
+        if not self._history_loaded:
+            self._history_loaded = True
+            if previous_conversation_log and not self.new_content and not self._contents:
+                self._contents.extend(self._get_previous_conversation_contents('executor', window=False))
         
-        # 4. Add current prompt
-        contents.append(types.Content(
+        # Build request contents: reference JSON contents + history window + current prompt
+        reference_contents = self._get_referenced_agent_json_contents(self.reference_json) if self.reference_json else ()
+        user_msg = types.Content(
             role="user",
             parts=[types.Part.from_text(text=prompt)]
-        ))
+        )
+        contents = list(itertools.chain(reference_contents, self._window_history(self._contents), (user_msg,)))
         
-        self._contents.append(contents[-1])
-        
-        # Print contents in a nice way: model:text
-        print("\nConversation contents so far:")
-        for c in contents:
-            if hasattr(c, "role") and hasattr(c, "parts"):
+        # Print contents in a nice way: model:text (FORGEO_DEBUG=1 or FORGEO_VERBOSE=3)
+        if self.debug:
+            print("\nConversation contents so far:")
+            for c in contents:
                 text = ""
-            if c.parts and hasattr(c.parts[0], "text"):
-                text = c.parts[0].text
-            print(f"{c.role}: {text}")
-        print("-" * 40)
+                if c.parts and hasattr(c.parts[0], "text"):
+                    text = c.parts[0].text
+                print(f"{c.role}: {text}")
+            print("-" * 40)
+        
+        active_keys = self._snapshot_keys(prompt)
         
-        for retry in range(max_retries):
-            api_key = None
+        request = {
+            "config": generate_config,
+            "custom_instruction": system_instruction is not None,
+            "contents": contents,
+            "user_msg": user_msg,
+            "active_keys": active_keys,
+            "response_cache": None,
+            "cache_embedding": None,
+            "cached": None,
+        }
+        # Serve repeated prompts (and near-identical ones when the answer has no code) from the response cache. Only requests that
+        # send the prompt alone qualify: with history or reference contents the answer depends on them
+        if self.response_cache and not self.new_content and system_instruction is None and len(contents) == 1:
+            response_cache = GeminiResponseCache.for_scope(self.model, f"{self._system_instruction_key}\0{self._response_schema_key()}")
+            cached_json, request["cache_embedding"] = response_cache.lookup(prompt, get_genai_client(active_keys[0]))
+            request["response_cache"] = response_cache
+            if cached_json is not None:
+                self._log_interaction(prompt, cached_json, success=True)
+                print(f"♻️  Response served from cache. Request from #{self.conversation_id}")
+                self._record_turn(self._contents, user_msg, json_dumps(cached_json))
+                request["cached"] = cached_json
+        return request
+
+    def _handle_generate_response(self, prompt: str, response, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate and record a generate response; raises ValueError for empty or invalid responses."""
+        if response.candidates and response.candidates[0].content:
             try:
-                api_key = manager.get_current_key()
-                
-                # Configure generation
-                generate_config = types.GenerateContentConfig(
-                    safety_settings=self.safety_settings,
-                    response_mime_type="application/json",
-                    response_schema=genai.types.Schema(
-                        type=genai.types.Type.OBJECT,
-                        required=self.output_required,
-                        properties=self.output_properties
-                    ),
-                    system_instruction=[
-                        types.Part.from_text(text=system_instruction)
-                    ]
-                )
-                
-                client = genai.Client(api_key=api_key)
-                response = client.models.generate_content(
-                    model=self.model,
-                    contents=contents,
-                    config=generate_config
-                )
-                
-                if response.candidates and response.candidates[0].content:
-                    try:
-                        response_json = json.loads(response.text)
-                        self._log_interaction(prompt, response_json, success=True)
-                        print(f"✅ Response received successfully! Request from #{self.conversation_id}")
-                        print(f"   - Explanation: {response_json.get('explanation', '')}")
-                        print(f"   - Task IDs: {response_json.get('ids', [])}")
-                        print(f"   - response: {response_json.get('response', [])}")
-                        print(f"   - Code Length: {len(response_json.get('python', ''))} characters")
-                        self._contents.append(types.Content(
-                            role="model",
-                            parts=[types.Part.from_text(text=json.dumps(response_json, ensure_ascii=False))]
-                        ))
-                        return response_json
-                        
-                    except json.JSONDecodeError as e:
-                        error_msg = f"Invalid JSON response: {e}"
-                        self._log_interaction(prompt, response.text, success=False, error=error_msg)
-                        raise ValueError(f"{error_msg}. Raw response: {response.text}")
+                # The SDK already decodes the JSON when a response_schema is set
+                parsed = getattr(response, "parsed", None)
+                if isinstance(parsed, dict):
+                    response_json = parsed
+                elif hasattr(parsed, "model_dump"):
+                    response_json = parsed.model_dump()
                 else:
-                    error_msg = f"Empty response. Feedback: {response.prompt_feedback}"
-                    self._log_interaction(prompt, None, success=False, error=error_msg)
-                    raise ValueError(error_msg)
-            
-            except (Unauthenticated, ResourceExhausted, GoogleAPICallError) as e:
-                error_msg = f"{e.code.name}: {e.details}"
-                manager.mark_key_failed(api_key, error_msg)
-                
-                if manager.get_detailed_status()['active_keys'] == 0:
-                    self._log_interaction(prompt, None, success=False, error="All API keys exhausted")
-                    raise Exception(f"All API keys exhausted. Last error: {error_msg}")
+                    response_json = json_loads(response.text)
+                self._log_interaction(prompt, response_json, success=True)
+                if self._verbose >= 2:
+                    print(
+                        f"✅ Response received successfully! Request from #{self.conversation_id}\n"
+                        f"   - Explanation: {response_json.get('explanation', '')}\n"
+                        f"   - Task IDs: {response_json.get('ids', [])}\n"
+                        f"   - response: {response_json.get('response', [])}\n"
+                        f"   - Code Length: {len(response_json.get('python', ''))} characters"
+                    )
+                elif self._verbose == 1:
+                    print(f"✅ Response received successfully! Request from #{self.conversation_id}")
+                # The model turn is the JSON text the model sent; no need to serialize the parsed dict again
+                self._record_turn(self._contents, request["user_msg"], response.text or json_dumps(response_json))
+                if request["response_cache"] is not None:
+                    request["response_cache"].store(prompt, response_json, request["cache_embedding"])
+                return response_json
                 
-                print(f"🔄 Retrying with different API key (attempt {retry + 1}/{max_retries})")
-                continue
-            
-            except Exception as e:
-                error_msg = str(e)
-                self._log_interaction(prompt, None, success=False, error=error_msg)
-                raise e
-        
-        raise Exception(f"Failed after {max_retries} retries")
-    
\ No newline at end of file
+            except JSONDecodeError as e:
+                error_msg = f"Invalid JSON response: {e}"
+                self._log_interaction(prompt, response.text, success=False, error=error_msg)
+                raise ValueError(f"{error_msg}. Raw response: {response.text}")
+        else:
+            error_msg = f"Empty response. Feedback: {response.prompt_feedback}"
+            self._log_interaction(prompt, None, success=False, error=error_msg)
+            raise ValueError(error_msg)
+
+    def generate_content(self, prompt: str, max_retries: int = 3, previous_conversation_log: bool = True,system_instruction:str = None) -> Dict[str, Any]:
+        """Make API call with error handling and retry logic."""
+        request = self._prepare_generate(prompt, previous_conversation_log, system_instruction)
+        if request["cached"] is not None:
+            return request["cached"]
+
+        def send(api_key: str) -> Dict[str, Any]:
+            response = get_genai_client(api_key).models.generate_content(
+                model=self.model,
+                contents=request["contents"],
+                config=self._config_for_key(api_key, request)
+            )
+            return self._handle_generate_response(prompt, response, request)
+
+        return self._run_with_retries(prompt, request["active_keys"], max_retries, send,
+                                      on_error=lambda api_key, e: self._drop_stale_cached_content(api_key, request, e))
+
+    async def agenerate_content(self, prompt: str, max_retries: int = 3, previous_conversation_log: bool = True,system_instruction:str = None) -> Dict[str, Any]:
+        """Async generate_content using the SDK's aio client, so independent sub-agents can run concurrently.
+
+        Run concurrent requests on separate GeminiAPIClient instances; each client keeps its own history.
+        """
+        # Preparing may block on the network (history summary, embedding lookup, cache creation),
+        # so it runs in a worker thread instead of stalling sub-agents gathered on this loop
+        request = await asyncio.to_thread(self._prepare_generate, prompt, previous_conversation_log, system_instruction)
+        if request["cached"] is not None:
+            return request["cached"]
+
+        async def send(api_key: str) -> Dict[str, Any]:
+            config = await asyncio.to_thread(self._config_for_key, api_key, request)
+            response = await get_async_genai_client(api_key).aio.models.generate_content(
+                model=self.model,
+                contents=request["contents"],
+                config=config
+            )
+            return self._handle_generate_response(prompt, response, request)
+
+        return await self._arun_with_retries(prompt, request["active_keys"], max_retries, send,
+                                             on_error=lambda api_key, e: self._drop_stale_cached_content(api_key, request, e))
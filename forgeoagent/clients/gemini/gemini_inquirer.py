@@ -1,96 +1,73 @@
 import os
-import json
 from typing import Dict, List, Any, Optional
-from google import genai
 
-from forgeoagent.core.managers.api_key_manager import GlobalAPIKeyManager
-
-from forgeoagent.config import (
-    DEFAULT_SYSTEM_INSTRUCTION_SEARCH,
-)
+from .gemini_client import get_genai_client
+from .gemini_retry import GeminiRetryMixin
 
 from google.genai import types
-from google.api_core.exceptions import Unauthenticated, ResourceExhausted, GoogleAPICallError
 
 
-class GeminiInquirer:
+class GeminiInquirer(GeminiRetryMixin):
+    @staticmethod
+    def _build_search_config(system_instruction_part: list) -> types.GenerateContentConfig:
+        """Build the Google Search grounded, plain-text generation config used by search_content."""
+        tools = [
+            types.Tool(googleSearch=types.GoogleSearch()),
+            # types.Tool(url_context=types.UrlContext()),
+            ]
+        return types.GenerateContentConfig(
+            thinking_config = types.ThinkingConfig(thinking_budget=-1,),
+            response_mime_type="text/plain",
+            tools=tools,
+            system_instruction=system_instruction_part,
+        )
+
+    def _custom_search_config(self, system_instruction: str) -> types.GenerateContentConfig:
+        """Search config for a per-call system instruction; the last one is kept since callers tend to repeat it."""
+        cached = self._custom_search_config_cache
+        if cached is not None and cached[0] == system_instruction:
+            return cached[1]
+        config = self._build_search_config([types.Part.from_text(text=system_instruction.strip())])
+        self._custom_search_config_cache = (system_instruction, config)
+        return config
+
     def search_content(self, prompt: str, max_retries: int = 3,system_instruction:str = None) -> Dict[str, Any]:
         """Make API call with error handling and retry logic."""
-        
         if system_instruction is not None:
-            system_instruction = system_instruction.strip()
-        elif system_instruction is None and self.system_instruction is not None:
-            system_instruction = DEFAULT_SYSTEM_INSTRUCTION_SEARCH + "\n\n" + self.system_instruction # Not Needed
+            generate_config = self._custom_search_config(system_instruction)
         else:
-            system_instruction = DEFAULT_SYSTEM_INSTRUCTION_SEARCH
+            generate_config = self._search_config
 
         self.request_count += 1
-        manager = GlobalAPIKeyManager()
 
-        contents = []
-        if not self.new_content:
-            contents.extend(self._get_previous_conversation_contents("inquirer"))
-            
-        contents.append(types.Content(
+        # The previous conversation is read from disk once; later turns are kept in memory
+        if self._search_contents is None and not self.new_content:
+            self._search_contents = self._get_previous_conversation_contents("inquirer", window=False)
+        user_msg = types.Content(
             role="user",
             parts=[types.Part.from_text(text=prompt)]
-        ))
+        )
+        contents = [user_msg] if self.new_content else self._window_history(self._search_contents) + [user_msg]
         
-        for retry in range(max_retries):
-            api_key = None
-            try:
-                api_key = manager.get_current_key()
-                tools = [
-                    types.Tool(googleSearch=types.GoogleSearch()),
-                    # types.Tool(url_context=types.UrlContext()),
-                    ]
-                # Configure generation
-                generate_config = types.GenerateContentConfig(
-                    thinking_config = types.ThinkingConfig(thinking_budget=-1,),
-                    response_mime_type="text/plain",
-                    tools=tools,
-                    system_instruction=[
-                        types.Part.from_text(text=system_instruction)
-                    ],
-                    
-                )
-                
-                client = genai.Client(api_key=api_key)
-                response = client.models.generate_content(
-                    model=self.model,
-                    contents=contents,
-                    config=generate_config
-                )
-                if response.candidates and response.candidates[0].content:
-                    try:
-                        self._log_interaction(prompt, response.text, success=True)
-                        return response.text
-                        
-                    except json.JSONDecodeError as e:
-                        error_msg = f"Invalid JSON response: {e}"
-                        self._log_interaction(prompt, response.text, success=False, error=error_msg)
-                        raise ValueError(f"{error_msg}. Raw response: {response.text}")
-                else:
-                    error_msg = f"Empty response. Feedback: {response.prompt_feedback}"
-                    self._log_interaction(prompt, None, success=False, error=error_msg)
-                    raise ValueError(error_msg)
-            
-            except (Unauthenticated, ResourceExhausted, GoogleAPICallError) as e:
-                error_msg = f"{e.code.name}: {e.details}"
-                manager.mark_key_failed(api_key, error_msg)
-                
-                if manager.get_detailed_status()['active_keys'] == 0:
-                    self._log_interaction(prompt, None, success=False, error="All API keys exhausted")
-                    raise Exception(f"All API keys exhausted. Last error: {error_msg}")
-                
-                print(f"🔄 Retrying with different API key (attempt {retry + 1}/{max_retries})")
-                continue
-            
-            except Exception as e:
-                error_msg = str(e)
-                self._log_interaction(prompt, None, success=False, error=error_msg)
-                
-                raise e
-        
-        raise Exception(f"Failed after {max_retries} retries")
-    
\ No newline at end of file
+        active_keys = self._snapshot_keys(prompt)
+
+        def send(api_key: str) -> str:
+            response = get_genai_client(api_key).models.generate_content(
+                model=self.model,
+                contents=contents,
+                config=generate_config
+            )
+            return self._handle_search_response(prompt, response, user_msg)
+
+        return self._run_with_retries(prompt, active_keys, max_retries, send)
+
+    def _handle_search_response(self, prompt: str, response, user_msg: types.Content) -> str:
+        """Log and record a search response and return its text; raises ValueError for empty responses."""
+        if response.candidates and response.candidates[0].content:
+            self._log_interaction(prompt, response.text, success=True)
+            if not self.new_content:
+                self._record_turn(self._search_contents, user_msg, response.text)
+            return response.text
+        error_msg = f"Empty response. Feedback: {response.prompt_feedback}"
+        self._log_interaction(prompt, None, success=False, error=error_msg)
+        raise ValueError(error_msg)
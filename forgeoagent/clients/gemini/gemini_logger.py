@@ -1,15 +1,133 @@
 import os
-import json
 import uuid
+import time
+import queue
+import atexit
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
 from forgeoagent.config import (
     MAIN_AGENT_LOG_DIR,
-    AGENT_LOG_DIR
+    AGENT_LOG_DIR,
+    ensure_log_dirs
 )
+from forgeoagent.core.helpers import json_dumps_line, json_loads, JSONDecodeError
+
+
+class _LogWriter:
+    """Background appender for JSONL logs.
+
+    Entries are queued by the request thread and written by a single daemon
+    thread that keeps buffered handles open for the ``max_open_files`` most
+    recently used log files and only flushes at the end of a batch (or every
+    ``flush_interval`` seconds).
+    """
+
+    def __init__(self, batch_size: int = 64, flush_interval: float = 0.1, buffering: int = 65536, max_open_files: int = 32):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffering = buffering
+        self.max_open_files = max_open_files
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._handles: "OrderedDict[str, Any]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="forgeoagent-log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.drain_and_close)
+
+    def submit(self, log_file: str, entry: Dict[str, Any]):
+        """Queue ``entry`` to be appended to ``log_file`` as one JSON line."""
+        if self._thread is None:
+            self._start()
+        self._queue.put((log_file, entry))
+
+    def flush(self):
+        """Block until every queued entry has been written and flushed."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def drain_and_close(self):
+        """Write pending entries and close all open handles (registered with atexit)."""
+        self.flush()
+        for handle in self._handles.values():
+            try:
+                handle.close()
+            except Exception:
+                pass
+        self._handles.clear()
+
+    def _handle_for(self, log_file: str):
+        handle = self._handles.get(log_file)
+        if handle is not None:
+            self._handles.move_to_end(log_file)
+            return handle
+        handle = open(log_file, "ab", buffering=self.buffering)
+        self._handles[log_file] = handle
+        # Every conversation has its own file; close the least recently used ones (closing flushes them)
+        while len(self._handles) > self.max_open_files:
+            _, evicted = self._handles.popitem(last=False)
+            try:
+                evicted.close()
+            except Exception:
+                pass
+        return handle
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and time.monotonic() < deadline:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            touched = set()
+            for log_file, entry in batch:
+                try:
+                    handle = self._handle_for(log_file)
+                    handle.write(json_dumps_line(entry))
+                    touched.add(handle)
+                except Exception as e:
+                    print(f"[!] Failed to write log entry to {log_file}: {e}")
+            for handle in touched:
+                if handle.closed:
+                    continue
+                try:
+                    handle.flush()
+                except Exception:
+                    pass
+            for _ in batch:
+                self._queue.task_done()
+
+
+_log_writer = _LogWriter()
+
+_ts_cache = [0, ""]
+
+
+def _now_iso() -> str:
+    """Return ``datetime.now().isoformat()``, recomputed at most once per millisecond."""
+    now_ns = time.monotonic_ns()
+    if now_ns - _ts_cache[0] >= 1_000_000:
+        _ts_cache[0] = now_ns
+        _ts_cache[1] = datetime.now().isoformat()
+    return _ts_cache[1]
+
 
 class GeminiLogger:
+    @staticmethod
+    def _flush_logs():
+        """Wait for queued log entries to reach disk before reading log files back."""
+        _log_writer.flush()
+
     def _init_log_file(self,type:str = "inquirer"):
         """Initialize the log file with metadata."""
         if not self.conversation_id:
@@ -20,27 +138,29 @@ class GeminiLogger:
         else:
             self.log_file = os.path.join(AGENT_LOG_DIR, f"{self.conversation_id}.jsonl")
             
-        if not os.path.exists(self.log_file):
-            with open(self.log_file, "w", encoding="utf-8") as f:
-                metadata = {
-                    "type": "metadata",
-                    "conversation_id": self.conversation_id,
-                    "start_time": datetime.now().isoformat(),
-                    "model": self.model
-                }
-                f.write(json.dumps(metadata) + "\n")
+        # Check the in-memory flag first so the event loop does not stat the log file on every call
+        if getattr(self, "_log_file_initialized", None) != self.log_file and not os.path.exists(self.log_file):
+            metadata = {
+                "type": "metadata",
+                "conversation_id": self.conversation_id,
+                "start_time": _now_iso(),
+                "model": self.model
+            }
+            _log_writer.submit(self.log_file, metadata)
+        self._log_file_initialized = self.log_file
     
     def _log_interaction(self, prompt: str, response_data: Any, success: bool = True, error: str = None,type:str = "inquirer",log_type:str = "interaction"):
         """Log API interactions."""
         # return for not creating logs in production environment
         if os.getenv('ENV_STATUS','production') == 'production':
             return
+        ensure_log_dirs()
         
         self._init_log_file(type)
         
         log_entry = {
             "type": log_type,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             "request_count": self.request_count,
             "success": success,
             "input": prompt,
@@ -51,8 +171,8 @@ class GeminiLogger:
                 log_entry["response"] = response_data
             elif hasattr(response_data, 'text'):
                 try:
-                    log_entry["response"] = json.loads(response_data.text)
-                except json.JSONDecodeError:
+                    log_entry["response"] = json_loads(response_data.text)
+                except JSONDecodeError:
                     log_entry["response"] = response_data.text
             else:
                 log_entry["response"] = str(response_data)
@@ -60,5 +180,4 @@ class GeminiLogger:
         if error:
             log_entry["error"] = error
         
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
+        _log_writer.submit(self.log_file, log_entry)
@@ -0,0 +1,83 @@
+import math
+import time
+import threading
+from typing import Dict, Optional
+
+from google.genai import types
+
+from .gemini_retry import _error_code
+
+# Refresh handles a little before the server expires them
+_EXPIRY_MARGIN_SECONDS = 60
+# After a transient failure (network error, 429, 5xx) caching is retried this much later
+_RETRY_AFTER_SECONDS = 300
+# Errors that will not go away by retrying: the prompt is too small to cache, or the model has no caching
+_PERMANENT_ERROR_CODES = frozenset({400, 404})
+
+_handles: Dict[tuple, tuple] = {}
+# Monotonic time until which caching is not attempted for a key (math.inf for permanent failures)
+_failed: Dict[tuple, float] = {}
+_lock = threading.Lock()
+# One lock per key, so caches.create runs outside the global lock but only once per key at a time
+_create_locks: Dict[tuple, threading.Lock] = {}
+
+
+def _cached_name(key: tuple) -> tuple:
+    """Return ``(known, name)`` for ``key`` from the handle and failure tables (call with ``_lock`` held)."""
+    now = time.monotonic()
+    if _failed.get(key, 0.0) > now:
+        return True, None
+    handle = _handles.get(key)
+    if handle is not None and handle[1] > now:
+        return True, handle[0]
+    return False, None
+
+
+def get_cached_content_name(client, api_key: str, model: str, system_instruction: list, instruction_key: str, ttl_seconds: int = 3600) -> Optional[str]:
+    """Return a Gemini cached-content name holding the ``system_instruction`` parts.
+
+    Handles are created once per (API key, model, ``instruction_key``) and reused until
+    shortly before their TTL runs out. Returns None when caching is not available
+    (e.g. the prompt is below the model's minimum cache size), so callers can fall
+    back to sending the system instruction inline. Transient failures only pause
+    caching for ``_RETRY_AFTER_SECONDS``.
+    """
+    key = (api_key, model, instruction_key)
+    with _lock:
+        known, name = _cached_name(key)
+        if known:
+            return name
+        create_lock = _create_locks.setdefault(key, threading.Lock())
+
+    with create_lock:
+        # Another thread may have created the handle while this one waited
+        with _lock:
+            known, name = _cached_name(key)
+            if known:
+                return name
+
+        try:
+            cache = client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=system_instruction,
+                    ttl=f"{ttl_seconds}s"
+                )
+            )
+        except Exception as e:
+            permanent = _error_code(e) in _PERMANENT_ERROR_CODES
+            print(f"[!] Prompt caching unavailable{'' if permanent else ' for now'}, sending the system instruction inline: {e}")
+            with _lock:
+                _failed[key] = math.inf if permanent else time.monotonic() + _RETRY_AFTER_SECONDS
+            return None
+
+        with _lock:
+            _failed.pop(key, None)
+            _handles[key] = (cache.name, time.monotonic() + ttl_seconds - _EXPIRY_MARGIN_SECONDS)
+        return cache.name
+
+
+def invalidate_cached_content(api_key: str, model: str, instruction_key: str) -> None:
+    """Forget the handle for this key/instruction so the next call creates a fresh one."""
+    with _lock:
+        _handles.pop((api_key, model, instruction_key), None)
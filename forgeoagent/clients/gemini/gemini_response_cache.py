@@ -0,0 +1,158 @@
+import os
+import copy
+import math
+import hashlib
+import threading
+from typing import Dict, List, Any, Optional
+
+from forgeoagent.config import LOG_DIR
+from forgeoagent.core.helpers import json_dumps_line, json_loads
+
+RESPONSE_CACHE_DIR = os.path.join(LOG_DIR, "sem_cache")
+EMBEDDING_MODEL = "text-embedding-004"
+
+
+class GeminiResponseCache:
+    """Exact + semantic cache of generate_content responses.
+
+    One cache exists per (model, system instruction) scope. A prompt is first looked
+    up by its SHA-256; on a miss its embedding is compared (cosine similarity) with
+    the embeddings of cached prompts and a response is reused when the similarity is
+    at least ``threshold``. Responses that carry generated ``python`` code are only
+    served for the exact prompt: code written for one file, path or number must not run
+    for a similar prompt about another, so they are never indexed for semantic matches. Entries are persisted as JSONL under ``logs/sem_cache``;
+    the file is rewritten with only the live entries once it holds twice ``max_entries``
+    lines (and on load when it has stale ones), so it does not grow forever.
+    """
+    _instances: Dict[str, "GeminiResponseCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, scope: str, threshold: float = 0.95, max_entries: int = 512):
+        self.scope = scope
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.cache_file = os.path.join(RESPONSE_CACHE_DIR, f"{scope}.jsonl")
+        self._exact: Dict[str, Any] = {}
+        self._vectors: List[tuple] = []  # (unit embedding, prompt key)
+        self._file_lines = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def for_scope(cls, model: str, system_instruction: str, threshold: float = 0.95) -> "GeminiResponseCache":
+        """Return the shared cache for a model/system instruction pair."""
+        scope = hashlib.sha256(f"{model}\0{system_instruction}".encode("utf-8")).hexdigest()[:32]
+        with cls._instances_lock:
+            cache = cls._instances.get(scope)
+            if cache is None:
+                cache = cls._instances[scope] = cls(scope, threshold=threshold)
+            return cache
+
+    @staticmethod
+    def _key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> Optional[tuple]:
+        norm = math.sqrt(sum(v * v for v in vector))
+        if not norm:
+            return None
+        return tuple(v / norm for v in vector)
+
+    def _load(self):
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "rb") as f:
+                for line in f:
+                    try:
+                        entry = json_loads(line)
+                    except Exception:
+                        continue
+                    self._file_lines += 1
+                    self._add(entry["key"], entry["response"], entry.get("embedding"))
+        except OSError:
+            return
+        if self._file_lines > len(self._exact):
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the cache file with only the entries still held in memory (call with the lock held or during init)."""
+        vectors = {key: list(vector) for vector, key in self._vectors}
+        temp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(temp_file, "wb") as f:
+                for key, response in self._exact.items():
+                    f.write(json_dumps_line({"key": key, "embedding": vectors.get(key), "response": response}))
+            os.replace(temp_file, self.cache_file)
+            self._file_lines = len(self._exact)
+        except OSError as e:
+            print(f"[!] Failed to compact response cache file: {e}")
+
+    @staticmethod
+    def _reusable_for_similar(response: Any) -> bool:
+        """Whether ``response`` may answer a prompt that is only similar (it has no code to execute)."""
+        return not (isinstance(response, dict) and str(response.get("python") or "").strip())
+
+    def _add(self, key: str, response: Any, embedding: Optional[List[float]]):
+        if key in self._exact:
+            self._vectors = [item for item in self._vectors if item[1] != key]
+        elif len(self._exact) >= self.max_entries:
+            oldest = next(iter(self._exact))
+            del self._exact[oldest]
+            self._vectors = [item for item in self._vectors if item[1] != oldest]
+        self._exact[key] = response
+        if embedding and self._reusable_for_similar(response):
+            unit = self._normalize(embedding)
+            if unit is not None:
+                self._vectors.append((unit, key))
+
+    def _embed(self, client, prompt: str) -> Optional[List[float]]:
+        try:
+            result = client.models.embed_content(model=EMBEDDING_MODEL, contents=prompt)
+            return list(result.embeddings[0].values)
+        except Exception as e:
+            print(f"[!] Response cache embedding failed, using exact matches only: {e}")
+            return None
+
+    def lookup(self, prompt: str, client=None) -> tuple:
+        """Return ``(response, embedding)``; ``response`` is None on a miss.
+
+        The embedding computed for a miss is returned so ``store`` can reuse it. The
+        response is a copy, so callers may change it without touching the cache.
+        """
+        key = self._key(prompt)
+        with self._lock:
+            response = copy.deepcopy(self._exact.get(key))
+        if response is not None or client is None:
+            return response, None
+
+        embedding = self._embed(client, prompt)
+        unit = self._normalize(embedding) if embedding else None
+        if unit is None:
+            return None, embedding
+
+        best_key, best_score = None, self.threshold
+        with self._lock:
+            for vector, cached_key in self._vectors:
+                score = sum(a * b for a, b in zip(unit, vector))
+                if score >= best_score:
+                    best_key, best_score = cached_key, score
+            if best_key is not None:
+                return copy.deepcopy(self._exact.get(best_key)), embedding
+        return None, embedding
+
+    def store(self, prompt: str, response: Any, embedding: Optional[List[float]] = None):
+        """Cache ``response`` for ``prompt`` and append it to the cache file."""
+        key = self._key(prompt)
+        with self._lock:
+            self._add(key, response, embedding)
+            try:
+                os.makedirs(RESPONSE_CACHE_DIR, exist_ok=True)
+                with open(self.cache_file, "ab") as f:
+                    f.write(json_dumps_line({"key": key, "embedding": embedding, "response": response}))
+                self._file_lines += 1
+            except OSError as e:
+                print(f"[!] Failed to persist response cache entry: {e}")
+            if self._file_lines > 2 * self.max_entries:
+                self._compact()
@@ -0,0 +1,183 @@
+import re
+import time
+import random
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+from forgeoagent.core.managers.api_key_manager import GlobalAPIKeyManager
+
+from google.genai import errors as genai_errors
+
+try:
+    from google.api_core import exceptions as api_core_exceptions
+except ImportError:
+    api_core_exceptions = None
+
+# Backoff between retries: min(cap, base * 2**retry) seconds with +-25% jitter
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 30.0
+
+_KEY_ERROR_CODES = frozenset({401, 403})
+_RATE_LIMIT_CODE = 429
+_TRANSIENT_CODES = frozenset({408, 500, 502, 503, 504})
+
+_RETRY_DELAY_RE = re.compile(r"""retryDelay['"]?\s*:\s*['"]?(\d+(?:\.\d+)?)s""")
+
+if api_core_exceptions is not None:
+    _API_ERRORS = (genai_errors.APIError, api_core_exceptions.GoogleAPICallError)
+else:
+    _API_ERRORS = (genai_errors.APIError,)
+
+# Error kinds returned by classify_api_error
+KEY_ERROR = "key"
+RATE_LIMITED = "rate_limited"
+TRANSIENT = "transient"
+
+
+def _error_code(error: Exception) -> Optional[int]:
+    code = getattr(error, "code", None)
+    # google.api_core uses HTTPStatus members, google.genai plain ints
+    code = getattr(code, "value", code)
+    return code if isinstance(code, int) else None
+
+
+def describe_api_error(error: Exception) -> str:
+    """Short "CODE: message" text for logs and key-failure notes."""
+    code = getattr(error, "code", None)
+    name = getattr(code, "name", None) or getattr(error, "status", None) or code
+    message = getattr(error, "message", None) or getattr(error, "details", None) or str(error)
+    return f"{name}: {message}"
+
+
+def classify_api_error(error: Exception) -> Optional[str]:
+    """Return KEY_ERROR, RATE_LIMITED or TRANSIENT for retryable API errors, None for anything else.
+
+    A 429 caused by a per-day quota is reported as KEY_ERROR: the key is useless until
+    GlobalAPIKeyManager's daily reset, so waiting on it does not help.
+    """
+    if not isinstance(error, _API_ERRORS):
+        return None
+    code = _error_code(error)
+    if code in _KEY_ERROR_CODES:
+        return KEY_ERROR
+    if code == _RATE_LIMIT_CODE:
+        return KEY_ERROR if "PerDay" in str(error) else RATE_LIMITED
+    if code in _TRANSIENT_CODES:
+        return TRANSIENT
+    return None
+
+
+def retry_delay(error: Exception, retry: int, base: float = BACKOFF_BASE_SECONDS, cap: float = BACKOFF_CAP_SECONDS) -> float:
+    """Seconds to wait before the next attempt.
+
+    Uses the server's RetryInfo ``retryDelay`` or ``Retry-After`` header when present,
+    otherwise exponential backoff with jitter. Server values are capped at ``cap`` too, so
+    one response cannot park a key (or a blocking caller) for minutes.
+    """
+    match = _RETRY_DELAY_RE.search(str(error))
+    if match:
+        return min(cap, float(match.group(1)))
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers:
+        try:
+            return min(cap, max(0.0, float(headers.get("retry-after"))))
+        except (TypeError, ValueError):
+            pass
+    return min(cap, base * 2 ** retry) * random.uniform(0.75, 1.25)
+
+
+class GeminiRetryMixin:
+    """Key selection and retry loop shared by generate_content, agenerate_content and search_content."""
+
+    def _snapshot_keys(self, prompt: str) -> List[str]:
+        active_keys = GlobalAPIKeyManager.snapshot_active_keys()
+        if not active_keys:
+            self._log_interaction(prompt, None, success=False, error="All API keys exhausted")
+            raise Exception("All API keys exhausted")
+        return active_keys
+
+    def _run_with_retries(self, prompt: str, active_keys: List[str], max_retries: int,
+                          send: Callable[[str], Any], on_error: Optional[Callable[[str, Exception], bool]] = None) -> Any:
+        """Return ``send(api_key)``, retrying API errors with other keys or after a backoff.
+
+        ``on_error(api_key, error)`` may return True to retry straight away; errors that are
+        neither handled there nor retryable API errors are logged and raised.
+        """
+        last_error = None
+        for retry in range(max_retries):
+            api_key, wait = GlobalAPIKeyManager.reserve_key(active_keys)
+            if wait:
+                time.sleep(wait)
+            try:
+                return send(api_key)
+            except Exception as e:
+                last_error = e
+                delay = self._retry_delay_after(prompt, api_key, active_keys, e, retry, max_retries, on_error)
+                if delay:
+                    time.sleep(delay)
+        
+        raise self._retries_exhausted(prompt, max_retries, last_error) from last_error
+
+    async def _arun_with_retries(self, prompt: str, active_keys: List[str], max_retries: int,
+                                 send: Callable[[str], Awaitable[Any]], on_error: Optional[Callable[[str, Exception], bool]] = None) -> Any:
+        """Async ``_run_with_retries``: ``send(api_key)`` returns an awaitable and waits use ``asyncio.sleep``."""
+        last_error = None
+        for retry in range(max_retries):
+            api_key, wait = GlobalAPIKeyManager.reserve_key(active_keys)
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                return await send(api_key)
+            except Exception as e:
+                last_error = e
+                delay = self._retry_delay_after(prompt, api_key, active_keys, e, retry, max_retries, on_error)
+                if delay:
+                    await asyncio.sleep(delay)
+        
+        raise self._retries_exhausted(prompt, max_retries, last_error) from last_error
+
+    def _retries_exhausted(self, prompt: str, max_retries: int, last_error: Optional[Exception]) -> Exception:
+        """Log the final failure and build the exception raised once every attempt failed."""
+        error_msg = f"Failed after {max_retries} retries"
+        if last_error is not None:
+            error_msg = f"{error_msg}. Last error: {describe_api_error(last_error)}"
+        self._log_interaction(prompt, None, success=False, error=error_msg)
+        return Exception(error_msg)
+
+    def _retry_delay_after(self, prompt: str, api_key: str, active_keys: List[str], error: Exception,
+                           retry: int, max_retries: int, on_error: Optional[Callable[[str, Exception], bool]]) -> float:
+        """Apply the retry policy for ``error`` and return the seconds to sleep, or re-raise it.
+
+        Key errors mark ``api_key`` failed and drop it (raising when no keys are left), rate
+        limits put the key on a shared cool-down so the next reservation moves to another key
+        or waits for it, and transient server errors back off before retrying.
+        """
+        if on_error is not None and on_error(api_key, error):
+            return 0.0
+        kind = classify_api_error(error)
+        if kind is None:
+            self._log_interaction(prompt, None, success=False, error=str(error))
+            raise error
+
+        error_msg = describe_api_error(error)
+        last_attempt = retry + 1 >= max_retries
+        if kind == KEY_ERROR:
+            GlobalAPIKeyManager.mark_key_failed(api_key, error_msg)
+            active_keys.remove(api_key)
+            if not active_keys:
+                self._log_interaction(prompt, None, success=False, error="All API keys exhausted")
+                raise Exception(f"All API keys exhausted. Last error: {error_msg}")
+            if not last_attempt:
+                print(f"🔄 Retrying with different API key (attempt {retry + 1}/{max_retries})")
+            return 0.0
+
+        # Nothing is retried after the last attempt, so there is nothing to wait or announce
+        if last_attempt:
+            return 0.0
+        delay = retry_delay(error, retry)
+        if kind == RATE_LIMITED:
+            GlobalAPIKeyManager.defer_key(api_key, delay)
+            print(f"⏳ Rate limited ({error_msg}); retrying (attempt {retry + 1}/{max_retries})")
+            return 0.0
+        print(f"⏳ {error_msg}; retrying in {delay:.1f}s (attempt {retry + 1}/{max_retries})")
+        return delay
@@ -3,21 +3,29 @@ import json
 import uuid
 from datetime import datetime
 import traceback
-from typing import Dict, List, Any, Optional
-from google import genai
+import ast
+import asyncio
+import inspect
+import hashlib
+import linecache
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Sequence
 import sys
 
 from forgeoagent.core.managers.pip_install_manager import PIPInstallManager
 from forgeoagent.core.managers.api_key_manager import GlobalAPIKeyManager
 from forgeoagent.core.mcp_class_analyzer import PyClassAnalyzer
-from forgeoagent.core.helpers import capture_print_output
+from forgeoagent.core.helpers import capture_print_output, gather, run_coroutine_sync
 
 from forgeoagent.config import (
     DEFAULT_SYSTEM_INSTRUCTION,
+    DEFAULT_SYSTEM_INSTRUCTION_HASH,
+    DEFAULT_SYSTEM_INSTRUCTION_SEARCH,
     DEFAULT_OUTPUT_REQUIRED,
-    DEFAULT_OUTPUT_PROPERTIES,
     DEFAULT_MODEL,
-    DEFAULT_SAFETY_SETTINGS,
+    default_output_properties,
+    default_safety_settings,
     MCP_TOOLS_DIR,
 )
 
@@ -25,30 +33,203 @@ from google.genai import types
 
 from forgeoagent.clients.gemini import GeminiLogger , GeminiContentManager , GeminiExecutor , GeminiInquirer
 
+# Constant instruction prefixes shared by every client, so requests start with identical parts
+_DEFAULT_INSTRUCTION_PART = types.Part.from_text(text=DEFAULT_SYSTEM_INSTRUCTION)
+_SEARCH_INSTRUCTION_PART = types.Part.from_text(text=DEFAULT_SYSTEM_INSTRUCTION_SEARCH)
+
+# LRU cache of compiled generated code, keyed by a hash of the source
+_CODE_CACHE_SIZE = 64
+_code_cache: "OrderedDict[bytes, Any]" = OrderedDict()
+
+
+# Name under which _generate_content_async is available to generated code
+_ASYNC_GENERATE_HELPER = "_forgeo_generate_content"
+
+
+async def _generate_content_async(receiver: Any, *args, **kwargs) -> Any:
+    """Await ``receiver.agenerate_content(...)`` when it has one, else call ``generate_content(...)``.
+
+    Generated code is rewritten to call this instead of ``receiver.generate_content(...)``
+    inside ``async def`` bodies, since the receiver's type is only known at runtime: other
+    objects (google-generativeai models, MCP tools) have their own ``generate_content``.
+    """
+    agenerate = getattr(receiver, "agenerate_content", None)
+    if agenerate is not None and inspect.iscoroutinefunction(agenerate):
+        return await agenerate(*args, **kwargs)
+    result = receiver.generate_content(*args, **kwargs)
+    return await result if inspect.isawaitable(result) else result
+
+
+class _AwaitSubAgentCalls(ast.NodeTransformer):
+    """Rewrite ``agent.generate_content(...)`` inside ``async def`` bodies to ``await _generate_content_async(agent, ...)``.
+
+    Generated code often calls the blocking method from an ``async def main()``, which
+    would serialize a ``gather`` fan-out. The helper awaits ``agenerate_content`` on
+    GeminiAPIClient instances and falls back to the plain call for anything else. Calls
+    passed straight to ``gather``/``create_task`` are not awaited so they stay concurrent.
+    SDK calls (``client.models.generate_content``) and calls in nested sync functions are
+    left alone.
+    """
+    _AWAITABLE_CONSUMERS = {"gather", "create_task", "ensure_future", "wait_for"}
+
+    def __init__(self):
+        self._in_async = False
+
+    @staticmethod
+    def _is_sub_agent_call(node: ast.AST) -> bool:
+        return (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr == "generate_content"
+            and not (isinstance(node.func.value, ast.Attribute) and node.func.value.attr == "models")
+        )
+
+    @staticmethod
+    def _to_helper_call(node: ast.Call) -> ast.Call:
+        helper = ast.Name(id=_ASYNC_GENERATE_HELPER, ctx=ast.Load())
+        return ast.copy_location(ast.Call(func=helper, args=[node.func.value, *node.args], keywords=node.keywords), node)
+
+    def _visit_scope(self, node: ast.AST, is_async: bool) -> ast.AST:
+        outer, self._in_async = self._in_async, is_async
+        self.generic_visit(node)
+        self._in_async = outer
+        return node
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> ast.AST:
+        return self._visit_scope(node, True)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.AST:
+        return self._visit_scope(node, False)
+
+    def visit_Lambda(self, node: ast.Lambda) -> ast.AST:
+        return self._visit_scope(node, False)
+
+    def visit_Await(self, node: ast.Await) -> ast.AST:
+        if self._in_async and self._is_sub_agent_call(node.value):
+            self.generic_visit(node.value)
+            node.value = self._to_helper_call(node.value)
+            return node
+        self.generic_visit(node)
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        func = node.func
+        consumer = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+        if self._in_async and consumer in self._AWAITABLE_CONSUMERS:
+            for index, arg in enumerate(node.args):
+                # gather(*[agent.generate_content(p) for p in prompts]) passes the calls through a comprehension
+                if isinstance(arg, ast.Starred) and isinstance(arg.value, (ast.ListComp, ast.GeneratorExp)):
+                    comprehension = arg.value
+                    if self._is_sub_agent_call(comprehension.elt):
+                        self.generic_visit(comprehension.elt)
+                        comprehension.elt = self._to_helper_call(comprehension.elt)
+                elif self._is_sub_agent_call(arg):
+                    self.generic_visit(arg)
+                    node.args[index] = self._to_helper_call(arg)
+        self.generic_visit(node)
+        if self._in_async and self._is_sub_agent_call(node):
+            return ast.copy_location(ast.Await(value=self._to_helper_call(node)), node)
+        return node
+
+
+def _compile_generated_code(python_code: str, conversation_id: str = None) -> tuple:
+    """Compile generated code once and reuse the code object for identical source.
+
+    Returns ``(code_obj, calls_main)`` where ``calls_main`` tells whether the source
+    itself calls ``main()`` at top level, unconditionally (so an ``async def main`` is not
+    run a second time). A call under ``if __name__ == "__main__":`` does not count: the
+    generated code does not run as ``__main__``, so that block never executes.
+    """
+    key = hashlib.blake2b(python_code.encode("utf-8"), digest_size=16).digest()
+    compiled = _code_cache.get(key)
+    if compiled is not None:
+        _code_cache.move_to_end(key)
+        return compiled
+    filename = f"<agent-{conversation_id}-{key.hex()[:8]}>" if conversation_id else f"<agent-{key.hex()[:8]}>"
+    tree = ast.parse(python_code, filename, "exec")
+    calls_main = any(
+        isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "main"
+        for statement in tree.body
+        if isinstance(statement, (ast.Expr, ast.Assign, ast.AnnAssign, ast.AugAssign))
+        for node in ast.walk(statement)
+    )
+    tree = ast.fix_missing_locations(_AwaitSubAgentCalls().visit(tree))
+    compiled = (compile(tree, filename, "exec"), calls_main)
+    # Register the source so tracebacks show the generated lines
+    linecache.cache[filename] = (len(python_code), None, python_code.splitlines(True), filename)
+    _code_cache[key] = compiled
+    if len(_code_cache) > _CODE_CACHE_SIZE:
+        evicted_code, _ = _code_cache.popitem(last=False)[1]
+        linecache.cache.pop(evicted_code.co_filename, None)
+    return compiled
+
+
+# Execution banners, built once and printed with a single call each
+_EXECUTION_BANNER = "🚀 Starting Code Execution\n" + "=" * 50
+_EXECUTION_DONE = "-" * 30 + "\n✅ Code execution completed successfully!"
+
+# Names every generated program can use; a read-only view merged into a fresh dict per execution
+_execution_globals_base: Optional[MappingProxyType] = None
+
+
+def _get_execution_globals_base() -> MappingProxyType:
+    global _execution_globals_base
+    if _execution_globals_base is None:
+        from google import genai
+        _execution_globals_base = MappingProxyType({
+            'GeminiAPIClient': GeminiAPIClient,
+            'types': types,
+            'genai': genai,
+            'json': json,
+            'os': os,
+            'datetime': datetime,
+            'PIPInstallManager': PIPInstallManager,
+            'traceback': traceback,  # Add traceback for error handling
+            'asyncio': asyncio,
+            'gather': gather,  # asyncio.gather capped at max_inflight concurrent sub-agent calls
+            _ASYNC_GENERATE_HELPER: _generate_content_async,
+        })
+    return _execution_globals_base
+
 class GeminiAPIClient(GeminiLogger,GeminiContentManager,GeminiExecutor,GeminiInquirer):
     def __init__(self, 
                  api_keys: Optional[List[str]] = None,
                  system_instruction: str = None,
                  output_required: List[str] = DEFAULT_OUTPUT_REQUIRED,
-                 output_properties: Dict[str, types.Schema] = DEFAULT_OUTPUT_PROPERTIES,
+                 output_properties: Optional[Mapping[str, types.Schema]] = None,
                  model: str = DEFAULT_MODEL,
                  conversation_id: str = None,
-                 safety_settings: List[types.SafetySetting] = DEFAULT_SAFETY_SETTINGS,
+                 safety_settings: Optional[Sequence[types.SafetySetting]] = None,
                  reference_json: Any = None,
-                 new_content: bool = False):
+                 new_content: bool = False,
+                 max_history_turns: int = 20,
+                 summarize_history: bool = False,
+                 response_cache: bool = None,
+                 cached_content: bool = False):
         self.model = model
         self.output_required = output_required
-        self.output_properties = output_properties
-        self.safety_settings = safety_settings
+        self.output_properties = default_output_properties() if output_properties is None else output_properties
+        self.safety_settings = default_safety_settings() if safety_settings is None else safety_settings
         self.reference_json = reference_json
         self.new_content = new_content
+        self.max_history_turns = max_history_turns
+        self.summarize_history = summarize_history
+        # Opt-in exact/semantic response cache (or FORGEO_RESPONSE_CACHE=1); bypassed when new_content is set
+        self.response_cache = os.environ.get("FORGEO_RESPONSE_CACHE") == "1" if response_cache is None else response_cache
+        # Opt-in Gemini prompt caching of the system instruction (cached_content handles, 1h TTL)
+        self.cached_content = cached_content
+        # FORGEO_VERBOSE: 0 = quiet, 1 = status line only, 2 = response summary (default), 3 = also dump history
+        try:
+            self._verbose = int(os.environ.get("FORGEO_VERBOSE", "2"))
+        except ValueError:
+            self._verbose = 2
+        self.debug = os.environ.get("FORGEO_DEBUG") == "1" or self._verbose >= 3
         if api_keys is not None:
             GlobalAPIKeyManager.initialize(api_keys)
         
-        if system_instruction:
-            self.system_instruction = DEFAULT_SYSTEM_INSTRUCTION + "\n\n" + system_instruction
-        else:
-            self.system_instruction = None
+        self._custom_generate_config_cache = None
+        self._custom_search_config_cache = None
+        self.system_instruction = system_instruction
         self.conversation_id = conversation_id
         # self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         # self.conversation_id = conversation_id or f"agent_{self.timestamp}_{uuid.uuid4().hex[:8]}"
@@ -56,45 +237,71 @@ class GeminiAPIClient(GeminiLogger,GeminiContentManager,GeminiExecutor,GeminiInq
         
             
         self._contents = []
+        self._history_loaded = False
+        self._search_contents = None
+        self._conv_cache = {}
         self.request_count = 0
 
 
-    def _execute_generated_code(self, main_response: Dict[str, Any]) -> None:
-            print("🚀 Starting Code Execution")
-            print("=" * 50)
+    @property
+    def system_instruction(self) -> Optional[str]:
+        """Default prefix and agent instruction as one string (None without an agent instruction)."""
+        if len(self.system_instruction_parts) < 2:
+            return None
+        return "\n\n".join(self.system_instruction_parts)
+
+    @system_instruction.setter
+    def system_instruction(self, system_instruction: Optional[str]) -> None:
+        """Set the agent instruction and rebuild the parts and configs that requests are sent with."""
+        # System instruction is kept as parts: the constant DEFAULT_SYSTEM_INSTRUCTION prefix
+        # first, then the agent specific instruction
+        if system_instruction:
+            self.system_instruction_parts = [DEFAULT_SYSTEM_INSTRUCTION, system_instruction]
+            self._system_instruction_part = [_DEFAULT_INSTRUCTION_PART, types.Part.from_text(text=system_instruction)]
+            self._system_instruction_key = hashlib.sha256(DEFAULT_SYSTEM_INSTRUCTION_HASH + system_instruction.encode("utf-8")).hexdigest()
+            self._search_instruction_part = [_SEARCH_INSTRUCTION_PART] + self._system_instruction_part
+        else:
+            self.system_instruction_parts = [DEFAULT_SYSTEM_INSTRUCTION]
+            self._system_instruction_part = [_DEFAULT_INSTRUCTION_PART]
+            self._system_instruction_key = DEFAULT_SYSTEM_INSTRUCTION_HASH.hex()
+            self._search_instruction_part = [_SEARCH_INSTRUCTION_PART]
+        self._generate_config = self._shared_generate_config()
+        self._search_config = self._build_search_config(self._search_instruction_part)
+
+    def _execute_generated_code(self, main_response: Dict[str, Any], extra_globals: Optional[Dict[str, Any]] = None) -> None:
+            print(_EXECUTION_BANNER)
             
+            execution_globals = None
             try:
                 python_code = main_response.get("python", "")
                 if python_code.strip() == "":
                     return
                 mcp_tools_classes = PyClassAnalyzer.get_all_classes(MCP_TOOLS_DIR)
-                execution_globals = {
-                    'GeminiAPIClient': GeminiAPIClient,
-                    'types': types,
-                    'genai': genai,
-                    'json': json,
-                    'os': os,
-                    'datetime': datetime,
-                    'PIPInstallManager': PIPInstallManager,
-                    'traceback': traceback,  # Add traceback for error handling
-                }
-                execution_globals.update(mcp_tools_classes)
+                execution_globals = {**_get_execution_globals_base(), **mcp_tools_classes}
+                if extra_globals:
+                    execution_globals.update(extra_globals)
                 execution_globals["execution_globals"] = execution_globals
                 print("⚡ Executing generated Python code...")
                 
-                exec(python_code, execution_globals)
+                code_obj, calls_main = _compile_generated_code(python_code, self.conversation_id)
+                exec(code_obj, execution_globals)
+                # Generated code may define `async def main()` for concurrent sub-agents without running it
+                if not calls_main and inspect.iscoroutinefunction(execution_globals.get("main")):
+                    run_coroutine_sync(execution_globals["main"]())
                 # execution_print_sting = capture_print_output(lambda: exec(python_code, execution_globals))
                 # print(execution_print_sting)
                 # self._log_interaction("execution_print_sting :"+str(execution_print_sting),None,log_type="execution_print_string")
 
-                print("-" * 30)
-                print("✅ Code execution completed successfully!")
+                print(_EXECUTION_DONE)
                 
             except Exception as e:
                 error_msg = f"❌ Execution failed: {str(e)}"
-                print(error_msg)
                 self._log_interaction("Error in Your Code :"+error_msg,None)
-                print(f"📋 Traceback:\n{traceback.format_exc()}")
+                print(f"{error_msg}\n📋 Traceback:\n{traceback.format_exc()}")
+            finally:
+                # Drop the self-reference so the globals dict is freed without waiting for the cycle collector
+                if execution_globals is not None:
+                    execution_globals.pop("execution_globals", None)
 
 
 if __name__ == "__main__":
@@ -1,17 +1,30 @@
 import os
+import functools
 import dotenv
 dotenv.load_dotenv()
 
-from .config import MCP_TOOLS_DIR , LOG_DIR , MAIN_AGENT_LOG_DIR , AGENT_LOG_DIR , MCP_TOOLS_LOG_DIR
-if os.getenv('ENV_STATUS','production') == 'development':
-    os.makedirs(LOG_DIR, exist_ok=True)
-    os.makedirs(MAIN_AGENT_LOG_DIR, exist_ok=True)
-    os.makedirs(AGENT_LOG_DIR, exist_ok=True)
-    os.makedirs(MCP_TOOLS_LOG_DIR, exist_ok=True)
+from .config import MCP_TOOLS_DIR , LOG_DIR , MAIN_AGENT_LOG_DIR , AGENT_LOG_DIR , MCP_TOOLS_LOG_DIR , ensure_log_dirs
 
-from .config import DEFAULT_MODEL , DEFAULT_SAFETY_SETTINGS
+from .config import DEFAULT_MODEL , default_safety_settings , load_prompt
 
 
-from .main_executor_prompts import MAIN_AGENT_SYSTEM_INSTRUCTION , MAIN_AGENT_OUTPUT_REQUIRED , MAIN_AGENT_OUTPUT_PROPERTIES
-from .default_executor_prompts import DEFAULT_SYSTEM_INSTRUCTION , DEFAULT_OUTPUT_REQUIRED , DEFAULT_OUTPUT_PROPERTIES
-from .default_inquirer_prompts import DEFAULT_SYSTEM_INSTRUCTION_SEARCH
+from .main_executor_prompts import MAIN_AGENT_OUTPUT_REQUIRED , main_agent_output_properties
+from .default_executor_prompts import DEFAULT_OUTPUT_REQUIRED , default_output_properties , default_system_instruction_hash
+
+# Prompt texts (config/prompts/*.md) and google.genai backed defaults are built on first access (PEP 562)
+_LAZY_DEFAULTS = {
+    "MAIN_AGENT_SYSTEM_INSTRUCTION": functools.partial(load_prompt, "main_agent.md"),
+    "DEFAULT_SYSTEM_INSTRUCTION": functools.partial(load_prompt, "default.md"),
+    "DEFAULT_SYSTEM_INSTRUCTION_SEARCH": functools.partial(load_prompt, "search.md"),
+    "DEFAULT_SYSTEM_INSTRUCTION_HASH": default_system_instruction_hash,
+    "DEFAULT_SAFETY_SETTINGS": default_safety_settings,
+    "DEFAULT_OUTPUT_PROPERTIES": default_output_properties,
+    "MAIN_AGENT_OUTPUT_PROPERTIES": main_agent_output_properties,
+}
+
+
+def __getattr__(name):
+    factory = _LAZY_DEFAULTS.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
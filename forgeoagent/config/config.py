@@ -1,5 +1,5 @@
-from google.genai import types
 import os
+import functools
 import dotenv
 dotenv.load_dotenv()
 
@@ -8,13 +8,48 @@ MCP_TOOLS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "m
 LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "logs"))
 MAIN_AGENT_LOG_DIR = os.path.join(LOG_DIR, "executor")
 AGENT_LOG_DIR = os.path.join(LOG_DIR, "inquirer")
-MCP_TOOLS_LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "logs", "mcp_tools"))
+MCP_TOOLS_LOG_DIR = os.path.join(LOG_DIR, "mcp_tools")
+PROMPTS_DIR = os.path.join(os.path.dirname(__file__), "prompts")
+
+_LOG_DIRS_READY = False
+
+
+def ensure_log_dirs():
+    """Create the log directories once per process, on the first log write."""
+    global _LOG_DIRS_READY
+    if _LOG_DIRS_READY:
+        return
+    for log_dir in (MAIN_AGENT_LOG_DIR, AGENT_LOG_DIR, MCP_TOOLS_LOG_DIR):
+        os.makedirs(log_dir, exist_ok=True)
+    _LOG_DIRS_READY = True
+
+
+@functools.lru_cache(maxsize=None)
+def load_prompt(filename: str) -> str:
+    """Read a prompt from ``config/prompts`` once; later calls return the same string object."""
+    with open(os.path.join(PROMPTS_DIR, filename), "r", encoding="utf-8", newline="") as f:
+        return f.read()
 
 
 DEFAULT_MODEL = "gemini-2.5-flash"
-DEFAULT_SAFETY_SETTINGS = [
-    types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_LOW_AND_ABOVE"),
-    types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="BLOCK_LOW_AND_ABOVE"),
-    types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="BLOCK_LOW_AND_ABOVE"),
-    types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_LOW_AND_ABOVE"),
-]
\ No newline at end of file
+
+
+@functools.cache
+def default_safety_settings() -> tuple:
+    """Default safety settings; built on first use so importing the config does not load google.genai.
+
+    A tuple, since the same cached object is shared by every client.
+    """
+    from google.genai import types
+    return (
+        types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_LOW_AND_ABOVE"),
+        types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="BLOCK_LOW_AND_ABOVE"),
+        types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="BLOCK_LOW_AND_ABOVE"),
+        types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_LOW_AND_ABOVE"),
+    )
+
+
+def __getattr__(name):
+    if name == "DEFAULT_SAFETY_SETTINGS":
+        return default_safety_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,43 +1,50 @@
-from google import genai
-from google.genai import types
-
-DEFAULT_SYSTEM_INSTRUCTION = """You are a helpful AI assistant that completes tasks efficiently and accurately.
-
-CORE SAFETY CONSTRAINTS - ALWAYS FOLLOW THESE:
-- Never delete, modify, or access system-critical files or directories
-- No operations on system root directories (C:\\ on Windows, / on Unix, /System on macOS)
-- Prevent data corruption, unauthorized access, or information leakage
-- No hacking, exploitation, or malicious activities of any kind
-- Always validate file paths, inputs, and operations before execution
-- Respect user privacy and data protection principles
-- Never execute commands that could harm the user's system or data
-- Avoid operations that could violate user policies, terms of service, or legal requirements
-- Include comprehensive error handling and input validation with proper print statements
-- When working with files, only operate in safe, user-specified directories
-- Never access or modify sensitive system files, configuration files, or user credentials
-- Prevent any actions that could compromise system security or stability
-- Always prioritize user safety and system integrity over task completion
-- If any value is empty in output return empty string instead of anything like NA , null , none , etc.
-- use structure and plan if it is provided in the input to complete the task.
-
-If a request violates these safety constraints, politely decline and suggest a safer alternative approach.
-
-IMPORTANT: If you do not generate any code or response, return an empty string ("").
-"""
+import hashlib
+import functools
+from types import MappingProxyType
+
+from .config import load_prompt
+
+# DEFAULT_SYSTEM_INSTRUCTION lives in prompts/default.md and is read on first access
+
+
+@functools.cache
+def default_system_instruction_hash() -> bytes:
+    """SHA-256 of the shared prefix of every agent system instruction, used in cache keys."""
+    return hashlib.sha256(load_prompt("default.md").encode("utf-8")).digest()
+
 
 DEFAULT_OUTPUT_REQUIRED = ["response","python","imports"]
-DEFAULT_OUTPUT_PROPERTIES = {
-    "response": types.Schema(
-        type=genai.types.Type.STRING, 
-        description="The agent's response to the given task"
-    ),
-    "python": types.Schema(
-        type=genai.types.Type.STRING, 
-        description="The Python code generated to accomplish the task"
-    ),
-    "imports": types.Schema(
-        type=genai.types.Type.ARRAY,
-        items=types.Schema(type=genai.types.Type.STRING),
-        description="List of required packages to install via pip (empty array if none needed)"
-    )
-}
\ No newline at end of file
+
+
+@functools.cache
+def default_output_properties() -> MappingProxyType:
+    """Response schema of a default agent; built on first use so importing the prompts does not load google.genai.
+
+    Read-only, since the one cached mapping is shared by every client.
+    """
+    from google.genai import types
+    return MappingProxyType({
+        "response": types.Schema(
+            type=types.Type.STRING, 
+            description="The agent's response to the given task"
+        ),
+        "python": types.Schema(
+            type=types.Type.STRING, 
+            description="The Python code generated to accomplish the task"
+        ),
+        "imports": types.Schema(
+            type=types.Type.ARRAY,
+            items=types.Schema(type=types.Type.STRING),
+            description="List of required packages to install via pip (empty array if none needed)"
+        )
+    })
+
+
+def __getattr__(name):
+    if name == "DEFAULT_SYSTEM_INSTRUCTION":
+        return load_prompt("default.md")
+    if name == "DEFAULT_SYSTEM_INSTRUCTION_HASH":
+        return default_system_instruction_hash()
+    if name == "DEFAULT_OUTPUT_PROPERTIES":
+        return default_output_properties()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,8 @@
-DEFAULT_SYSTEM_INSTRUCTION_SEARCH = """You are a web search agent. Your task is to search Google for the user's query and return only the most relevant, concise, and accurate plain json object or plain test string.
-Instructions:
-- Perform a Google search using the user's query.
-- Read and synthesize information from the top results.
-- Do NOT mention that you searched source; just provide the answer.
-- If you cannot find an answer, reply with an empty string.
-"""
+from .config import load_prompt
+
+
+def __getattr__(name):
+    # The prompt text lives in prompts/search.md and is read on first access
+    if name == "DEFAULT_SYSTEM_INSTRUCTION_SEARCH":
+        return load_prompt("search.md")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
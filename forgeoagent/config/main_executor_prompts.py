@@ -1,240 +1,67 @@
-from google import genai
-from google.genai import types
+import functools
+from types import MappingProxyType
 
-MAIN_AGENT_SYSTEM_INSTRUCTION = """You are a Main Orchestrator Agent and Master Agent Creator that coordinates a hierarchy of specialized AI agents to decompose complex user requests into structured, executable Python workflows. Your objective is to ensure seamless collaboration among all agents to generate accurate, efficient, and modular Python code solutions.
+from .config import load_prompt
 
-### Tools :
-You leverage %(GEMINI_CLASS_ANALYZER)s and %(MCP_CLASS_ANALYZER)s to dynamically create, manage, and optimize sub-agents specialized in distinct analytical or computational tasks.
-given class and execution_globals you can directly use no need to import this or initialization.
-and other libraries you have to import them in the code.
+# MAIN_AGENT_SYSTEM_INSTRUCTION lives in prompts/main_agent.md (a %-format template) and is read on first access
 
-**Additional Available Classes:**
-- **Unsplash**: For searching and retrieving high-quality images from Unsplash API
-  - Method: `search_unsplash(query, per_page=2)` - Returns list of image dictionaries with 'url', 'thumbnail', and 'description'
-  - Use this when user requests image-related tasks, visual guides, or image books
-  - Example: `unsplash = Unsplash(); images = unsplash.search_unsplash('sunset beach', per_page=3)`
-
-### ⚙️ CORE ARCHITECTURE
-**Flow Overview:**
-1.(Optional If needed) Gets What Folder we have to deal with than create structure from StructureManagers First Use structure_manager = StructureManager() and than structure_manager.add_folder_structure(GIVEN_FOLDER_PATH) than pass this structure_manager.get_current_structure() to every geminiapiclient call as <structure></structure> tag if python files there
-2. Creates a plan which includes all necessary information like what other agents create a class , function , variable and have to use than for that use. it enclose with <plan></plan> tag
-3. Create a sub agents and pass structure and plan to them for separated task and execute generated python code by that sub agents using exec(response_from_gemini_variable_name['python'],execution_globals) and always wrap with try catch block
-
-
-### ⚖️ RULES
-
-- **Error Handling:** Use robust `try/except` around all exec and file operations.  
-- **Safety & Constraints:**
-  - Operate **only** within safe, user-specified directories.
-  - Validate **all** file paths before operations.
-  - Never modify or delete system-critical files.
-- **Code Quality:**
-  - Clean, readable, modular, and well-commented.
-  - Print progress and completion messages clearly.
-- **Dependencies:**
-  - If external packages are required, list them in the `"imports"` field which are not build-in packages.
-- **Output:**
-  - Always return readable, structured JSON output (see below).
-
-### 📦 RESPONSE FORMAT
-Return a **JSON object** with **exactly these keys**:
-{
-    "explanation": "Brief explanation of your approach and what the code will do",
-    "python": "Complete executable Python code that accomplishes the task",
-    "imports": ["package1", "package2"] // List of required packages to install via pip (empty array if none needed dont give build-in packages in this list like dont give json , datetime etc),
-    "ids": ["task_related_name_1", "task_related_name_2"] // Simple task identifiers for progress tracking
-}
-Return an empty string if no code is generated.
-
-💡 EXAMPLE
-
-User Request: "Create a text file with tips for making viral YouTube shorts."
-
-Response:
-{
-  "explanation": "Creates plan, directory, and file with actionable YouTube shorts tips using sub-agent execution.",
-  "python": "
-try:
-    plan_name = 'viral_youtube_shorts'
-
-    # Step 1: Content generation
-    content_agent = GeminiAPIClient(conversation_id='generate_content',system_instruction='Generate a detailed and minimalist research on given topic')
-    raw_tips = content_agent.search_content('Tips for viral YouTube shorts')
-
-    # Step 2: Save tips to file
-    file_manipulation = FileManipulation()
-    file_manipulation.write_file('youtube_shorts_tips/tips.txt', raw_tips)
-    print('execution_globals.get("response", "")')
-    print('✅ Workflow completed successfully.')
-
-except Exception as e:
-    print('❌ Error:', str(e))
-",
-  "imports": [],
-  "ids": ["generate_content", "write_content"]
-}
-
-User Request: "summarize this folder path /user/documents/research into a concise report."
-
-Response:
-{
-  "explanation": "Creates a summary report of the specified folder path using sub-agent execution.",
-  "python": "
-try:
-    # Validate folder existence
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Folder not found: {path}")
-    plan_name = 'folder_summary' 
-    structure_manager = StructureManager() 
-    structure_manager.add_folder_structure('/user/documents/research') 
-    python_structure = structure_manager.get_current_structure() 
-    # Step 1: Planning 
-    plan = "we need to iterate through all files in the given folder path and summarize their content into a concise report string as variable named report_summary" 
-    report_summary = ""
-
-    # summary agent
-    summary_agent = GeminiAPIClient(conversation_id='summarize_folder', system_instruction='Summarize the contents of the given folder path into a concise report execution_globals["summary_text"]
-     using the provided structure and plan and response.') 
-    
-
-    # Iterate through all files in the directory
-    for root, _, files in os.walk(path):
-        for file in files:
-            file_path = os.path.join(root, file)
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read().strip()
-                    summary_response = summary_agent.generate_content(f"<structure>{python_structure}</structure><plan>{plan}</plan><data>{content}</data>") 
-                    exec(summary_response['python'], execution_globals)
-                    report_summary.append(f"📄 {file_path}\n→ Summary: {summary_response.get('summary_text', '')}\n")
-                    sleep(2)  # To avoid rate limiting
-            except Exception as inner_err:
-                report_summary.append(f"⚠️ {file_path} - Could not read file: {inner_err}\n")
-    # Save summary to file
-    file_manipulation = FileManipulation()
-    file_manipulation.write_file('summary_report.txt', report_summary)
-    print('execution_globals.get("response", "")')
-    print(f"✅ Summary report created successfully at: summary_report.txt")
-
-except Exception as e:
-    print(f"❌ Error while summarizing folder: {e}")
-",
-  "imports": [],
-  "ids": ["planner_agent", "create_directory", "write_content"]
-}
-
-User Request: "Create an image book about how to make coffee"
+MAIN_AGENT_OUTPUT_REQUIRED = ["explanation", "python", "ids","response", "imports"]
 
-Response:
-{
-  "explanation": "Searches for coffee-making images on Unsplash, generates educational content, and creates a beautiful HTML page with embedded styles and modal viewer.",
-  "python": "
-try:
-    # Step 1: Search for relevant images
-    unsplash = Unsplash()
-    images = unsplash.search_unsplash('making coffee brewing', per_page=3)
-    
-    if not images:
-        raise ValueError('No images found for the topic')
-    
-    # Step 2: Generate content for each image
-    content_agent = GeminiAPIClient(
-        conversation_id='generate_image_explanations',
-        system_instruction='Generate detailed, educational explanations for coffee-making images with title, description, key elements, context, and practical tips.'
-    )
-    
-    # Build HTML with modern UI
-    html_content = '''<!DOCTYPE html>
-<html lang=\\\"en\\\">
-<head>
-    <meta charset=\\\"UTF-8\\\">
-    <meta name=\\\"viewport\\\" content=\\\"width=device-width, initial-scale=1.0\\\">
-    <title>📚 Visual Guide: How to Make Coffee</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: 'Segoe UI', sans-serif;
-            background: linear-gradient(135deg, #667eea 0%%, #764ba2 100%%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background: rgba(255, 255, 255, 0.95);
-            border-radius: 20px;
-            padding: 40px;
-            box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
-        }
-        .image-card {
-            background: white;
-            border-radius: 15px;
-            padding: 30px;
-            margin-bottom: 40px;
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.1);
-        }
-        .image-container img {
-            width: 100%%;
-            border-radius: 10px;
-            cursor: pointer;
-        }
-    </style>
-</head>
-<body>
-    <div class=\\\"container\\\">
-        <h1>📚 Visual Guide: How to Make Coffee</h1>
-'''
-    
-    # Add image cards
-    for i, img in enumerate(images):
-        explanations = content_agent.search_content(f\\\"Explain this coffee-making image: {img.get('description', 'Coffee making step')}\\\")
-        html_content += f'''
-        <div class=\\\"image-card\\\">
-            <h2>Step {i+1}: {img.get('description', 'Coffee Making')}</h2>
-            <div class=\\\"image-container\\\">
-                <img src=\\\"{img['url']}\\\" alt=\\\"{img.get('description', 'Coffee image')}\\\">
-            </div>
-            <p>{explanations}</p>
-        </div>
-'''
-    
-    html_content += '</div></body></html>'
-    
-    # Step 3: Save HTML file
-    file_manipulation = FileManipulation()
-    file_manipulation.write_file('coffee_making_guide.html', html_content)
-    
-    execution_globals['response'] = html_content
-    print('✅ Image book created successfully: coffee_making_guide.html')
-    print(f'📸 Found {len(images)} images')
-    
-except Exception as e:
-    print(f'❌ Error: {str(e)}')
-"""
 
-MAIN_AGENT_OUTPUT_REQUIRED = ["explanation", "python", "ids","response", "imports"]
-MAIN_AGENT_OUTPUT_PROPERTIES = {
-    "explanation": types.Schema(
-        type=genai.types.Type.STRING, 
-        description="Brief explanation of the approach and what the code will do"
-    ),
-    "python": types.Schema(
-        type=genai.types.Type.STRING, 
-        description="Complete executable Python code that accomplishes the task"
-    ),
-    "ids": types.Schema(
-        type=genai.types.Type.ARRAY, 
-        items=types.Schema(type=genai.types.Type.STRING), 
-        description="Simple task identifiers for progress tracking"
-    ),
-    "response": types.Schema(
-        type=genai.types.Type.STRING, 
-        description="The agent's response to the given task"
-    ),
-    "imports": types.Schema(
-        type=genai.types.Type.ARRAY,
-        items=types.Schema(type=genai.types.Type.STRING),
-        description="List of required packages to install via pip (empty array if none needed)"
-    )
-    
-}
+@functools.cache
+def main_agent_output_properties() -> MappingProxyType:
+    """Response schema of the main agent; built on first use so importing the prompts does not load google.genai.
+
+    Read-only, since the one cached mapping is shared by every client.
+    """
+    from google.genai import types
+    return MappingProxyType({
+        "explanation": types.Schema(
+            type=types.Type.STRING, 
+            description="Brief explanation of the approach and what the code will do"
+        ),
+        "python": types.Schema(
+            type=types.Type.STRING, 
+            description="Complete executable Python code that accomplishes the task"
+        ),
+        "ids": types.Schema(
+            type=types.Type.ARRAY, 
+            items=types.Schema(type=types.Type.STRING), 
+            description="Simple task identifiers for progress tracking"
+        ),
+        "response": types.Schema(
+            type=types.Type.STRING, 
+            description="The agent's response to the given task"
+        ),
+        "imports": types.Schema(
+            type=types.Type.ARRAY,
+            items=types.Schema(type=types.Type.STRING),
+            description="List of required packages to install via pip (empty array if none needed)"
+        ),
+        "subtasks": types.Schema(
+            type=types.Type.ARRAY,
+            items=types.Schema(
+                type=types.Type.OBJECT,
+                required=["id", "prompt"],
+                properties={
+                    "id": types.Schema(type=types.Type.STRING, description="Task identifier, key in subtask_results"),
+                    "prompt": types.Schema(type=types.Type.STRING, description="Complete prompt for the sub-agent"),
+                    "system_instruction": types.Schema(type=types.Type.STRING, description="System instruction for the sub-agent"),
+                    "depends_on": types.Schema(
+                        type=types.Type.ARRAY,
+                        items=types.Schema(type=types.Type.STRING),
+                        description="Ids of subtasks whose responses this subtask needs (empty array if none)"
+                    ),
+                }
+            ),
+            description="Optional sub-agent tasks run as a dependency graph before the python code (empty array if none)"
+        )
+    })
+
+
+def __getattr__(name):
+    if name == "MAIN_AGENT_SYSTEM_INSTRUCTION":
+        return load_prompt("main_agent.md")
+    if name == "MAIN_AGENT_OUTPUT_PROPERTIES":
+        return main_agent_output_properties()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,21 +1,60 @@
 import os
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import traceback
 from typing import Dict, List, Any, Optional
 
 from forgeoagent.core.managers.pip_install_manager import PIPInstallManager
 from forgeoagent.core.mcp_class_analyzer import PyClassAnalyzer
+from forgeoagent.core.helpers import json_loads
 
 from forgeoagent.config import (
     MAIN_AGENT_SYSTEM_INSTRUCTION,
     MAIN_AGENT_OUTPUT_REQUIRED,
-    MAIN_AGENT_OUTPUT_PROPERTIES,
     MCP_TOOLS_DIR,
+    main_agent_output_properties,
 )
 
-from forgeoagent.clients.gemini_engine import GeminiAPIClient
 from forgeoagent.core.managers.agent_manager import AgentManager
 
+CLIENTS_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "clients"))
+
+# Status banners are built once and printed with a single call each
+_RULE = "=" * 60
+_SYSTEM_BANNER = f"🚀 AI Agent System\n{_RULE}"
+
+
+@functools.lru_cache(maxsize=4)
+def _format_main_agent_instruction(gemini_class_analyzer: str, mcp_class_analyzer: str) -> str:
+    """Fill the main agent prompt template; cached because the analyzer output rarely changes."""
+    return MAIN_AGENT_SYSTEM_INSTRUCTION % {"GEMINI_CLASS_ANALYZER": gemini_class_analyzer,"MCP_CLASS_ANALYZER": mcp_class_analyzer}
+
+
+def _predict_reference_imports(reference_agent_path: Optional[str]) -> List[str]:
+    """Return the pip packages the selected reference agent's saved interaction asked for.
+
+    Only the agent's own main_agent.jsonl is read (its last successful interaction),
+    not every log that happens to sit in the folder.
+    """
+    if not reference_agent_path:
+        return []
+    imports: List[str] = []
+    try:
+        with open(os.path.join(reference_agent_path, "main_agent.jsonl"), "rb") as f:
+            for line in f:
+                try:
+                    data = json_loads(line)
+                except Exception:
+                    continue
+                response = data.get("response") if isinstance(data, dict) and data.get("type") == "interaction" else None
+                if isinstance(response, dict) and isinstance(response.get("imports"), list):
+                    imports = [name for name in response["imports"] if isinstance(name, str)]
+    except OSError:
+        return []
+    return list(dict.fromkeys(imports))
+
+
 def print_available_executors():
     """Print all saved agents from AgentManager."""
     agent_manager = AgentManager()
@@ -29,12 +68,14 @@ def print_available_executors():
 
 def save_last_executor(agent_name: str = None):
     """Save the last executor conversation to the agent manager and return the conversation ID."""
+    from forgeoagent.clients.gemini_engine import GeminiAPIClient
     try:
         conversation_id = GeminiAPIClient._get_last_conversation_id('executor')
         if not agent_name:
             agent_name = conversation_id
     except:
         agent_name = conversation_id
+    GeminiAPIClient._flush_logs()
     AgentManager().save_agent(
                     agent_name=agent_name,
                     conversation_id=conversation_id
@@ -54,8 +95,10 @@ def create_master_executor(api_keys: List[str], user_request: str = None, refere
         new_content: Whether to create new content
         user_system_instruction: Optional custom user system instruction to append
     """
-    print("🚀 AI Agent System")
-    print("=" * 60)
+    from forgeoagent.clients.gemini_engine import GeminiAPIClient
+    from forgeoagent.clients.batch_runner import run_batch_sync
+
+    print(_SYSTEM_BANNER)
     
     # SUGGESTION : first get_agent_path than none than also valid because it return none if path not found so it is actual path so back to parameter
     if reference_agent_path and not os.path.isdir(reference_agent_path):
@@ -73,12 +116,11 @@ def create_master_executor(api_keys: List[str], user_request: str = None, refere
             print("❌ No request provided. Exiting...")
             return {"status": "error", "error": "No request provided"}
     
-        print("🎯 Main Agent System Starting")
-        print("=" * 60)
-        print(f"📥 User Request: {user_request}")
+        lines = ["🎯 Main Agent System Starting", _RULE, f"📥 User Request: {user_request}"]
         if reference_agent_path:
-            print(f"🔗 Using reference agent: {selected_agent['agent_name'] if selected_agent else 'Unknown'}")
-        print("=" * 60)
+            lines.append(f"🔗 Using reference agent: {selected_agent['agent_name'] if selected_agent else 'Unknown'}")
+        lines.append(_RULE)
+        print("\n".join(lines))
     print("🧠 Creating Main Agent...")
     
     try:
@@ -88,10 +130,13 @@ def create_master_executor(api_keys: List[str], user_request: str = None, refere
         else:
             conversation_id = f"executor_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-        GEMINI_CLASS_ANALYZER =PyClassAnalyzer.analyze_dir(f"{os.path.join(os.path.dirname(__file__))}/../clients"'')
-        MCP_CLASS_ANALYZER=PyClassAnalyzer.analyze_dir(MCP_TOOLS_DIR)
+        # The two directories are independent; analyze them concurrently (cheap when the fingerprint cache hits)
+        with ThreadPoolExecutor(max_workers=2) as analyzer_pool:
+            gemini_future = analyzer_pool.submit(PyClassAnalyzer.analyze_dir, CLIENTS_DIR)
+            mcp_future = analyzer_pool.submit(PyClassAnalyzer.analyze_dir, MCP_TOOLS_DIR)
+            GEMINI_CLASS_ANALYZER, MCP_CLASS_ANALYZER = gemini_future.result(), mcp_future.result()
 
-        main_agent_system_intruction = MAIN_AGENT_SYSTEM_INSTRUCTION % {"GEMINI_CLASS_ANALYZER": GEMINI_CLASS_ANALYZER,"MCP_CLASS_ANALYZER": MCP_CLASS_ANALYZER}
+        main_agent_system_intruction = _format_main_agent_instruction(GEMINI_CLASS_ANALYZER, MCP_CLASS_ANALYZER)
 
         # Merge user custom instruction with base system instruction
         if user_system_instruction:
@@ -101,16 +146,34 @@ def create_master_executor(api_keys: List[str], user_request: str = None, refere
             api_keys=api_keys,
             system_instruction=main_agent_system_intruction,
             output_required=MAIN_AGENT_OUTPUT_REQUIRED,
-            output_properties=MAIN_AGENT_OUTPUT_PROPERTIES,
+            output_properties=main_agent_output_properties(),
             conversation_id=conversation_id,
             reference_json=reference_agent_path or './merge_current_dir_agent',
-            new_content=new_content
+            new_content=new_content,
+            cached_content=True
         )
         
+        # Replaying a reference agent: install the packages it needed while the model is generating
+        predicted_imports = _predict_reference_imports(reference_agent_path)
+        prefetch = None
+        if predicted_imports:
+            print(f"📦 Pre-installing packages used by the reference agent: {predicted_imports}")
+            prefetch_pool = ThreadPoolExecutor(max_workers=1)
+            prefetch = prefetch_pool.submit(PIPInstallManager, predicted_imports)
+            prefetch_pool.shutdown(wait=False)
+        
         main_agent_response = main_agent.generate_content(user_request)
         
-        # Check if imports are needed and install them
-        imports = main_agent_response.get("imports", [])
+        # Collected only once generation succeeded, so a slow or failing install never hides its error
+        prefetched = set()
+        if prefetch is not None:
+            try:
+                prefetched = set(prefetch.result().get("installed", []))
+            except Exception as e:
+                print(f"⚠️  Pre-installing reference packages failed: {e}")
+        
+        # Check if imports are needed and install them (skipping the ones pre-installed above)
+        imports = [name for name in main_agent_response.get("imports", []) if name not in prefetched]
         if imports:
             print(f"\n🔍 Detected required packages: {imports}")
             pip_result = PIPInstallManager(imports)
@@ -119,7 +182,14 @@ def create_master_executor(api_keys: List[str], user_request: str = None, refere
             if pip_result['status'] == 'partial_success' or pip_result['failed']:
                 print("⚠️  Some packages failed to install. Proceeding with execution...")
         
-        execution_result = main_agent._execute_generated_code(main_agent_response)
+        # Independent subtasks are sent concurrently; the code reads them from subtask_results
+        subtasks = main_agent_response.get("subtasks") or []
+        extra_globals = None
+        if subtasks:
+            print(f"\n🧩 Running {len(subtasks)} subtasks concurrently...")
+            extra_globals = {"subtask_results": run_batch_sync(subtasks)}
+        
+        execution_result = main_agent._execute_generated_code(main_agent_response, extra_globals=extra_globals)
         print(f"✅ Task completed successfully!", execution_result)
         
         result = {
@@ -135,6 +205,7 @@ def create_master_executor(api_keys: List[str], user_request: str = None, refere
             if save_choice in ['y', 'yes']:
                 agent_name = input("Enter agent name: ").strip()
                 if agent_name:
+                    GeminiAPIClient._flush_logs()
                     agent_manager = AgentManager()
                     agent_manager.save_agent(
                         agent_name=agent_name,
@@ -152,6 +223,5 @@ def create_master_executor(api_keys: List[str], user_request: str = None, refere
             "error": str(e),
             "traceback": traceback.format_exc()
         }
-        print(f"❌ System Error: {error_result}")
-        print(f"❌ Task failed!")
+        print(f"❌ System Error: {error_result}\n❌ Task failed!")
         return error_result
\ No newline at end of file
@@ -2,8 +2,6 @@ import os
 import importlib
 from typing import List
 
-from forgeoagent.clients.gemini_engine import GeminiAPIClient
-
 def print_available_inquirers():
     """Print all available *_SYSTEM_INSTRUCTION variables from the current context."""
     for var_name in globals():
@@ -58,6 +56,7 @@ def inquirer_using_selected_system_instructions(input_text: str, api_keys: List[
     prompt_agent = prompt_agent.replace("_SYSTEM_INSTRUCTION", "")
     user_enhance = globals().get(f"{prompt_agent}_USER_INSTRUCTION", "```user_input")
     query = f"{user_enhance} {input_text}```"
+    from forgeoagent.clients.gemini_engine import GeminiAPIClient
     main_agent = GeminiAPIClient(api_keys=api_keys, new_content=new_content, system_instruction=system_prompt)
     response = main_agent.search_content(query)
     print(response)
\ No newline at end of file
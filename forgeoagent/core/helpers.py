@@ -1,4 +1,5 @@
 import sys
+import threading
 from io import StringIO
 
 # Helper function to capture print output
@@ -15,4 +16,120 @@ def capture_print_output(func, *args, **kwargs):
         output = captured_output.getvalue()
         raise Exception(f"Function error: {str(e)}\nOutput: {output}")
     finally:
-        sys.stdout = old_stdout
\ No newline at end of file
+        sys.stdout = old_stdout
+
+# BeautifulSoup backend: lxml's C parser when it is installed, otherwise the stdlib one
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+def decode_html_response(response) -> str:
+    """Decode the body of an HTML ``requests`` response once.
+
+    Uses the charset from the Content-Type header, else the page's ``<meta charset>``,
+    else UTF-8. Unlike ``response.text`` it never guesses ISO-8859-1 for pages without
+    a header charset, and never runs charset detection.
+    """
+    content = response.content
+    if "charset=" in response.headers.get("Content-Type", "").lower():
+        encoding = response.encoding
+    else:
+        from bs4.dammit import EncodingDetector
+        encoding = EncodingDetector.find_declared_encoding(content, is_html=True)
+    try:
+        return content.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        return content.decode("utf-8", errors="replace")
+
+# JSON helpers: use orjson when it is installed, otherwise fall back to the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+if orjson is not None:
+    JSONDecodeError = orjson.JSONDecodeError
+
+    def json_dumps_bytes(obj) -> bytes:
+        """Serialize ``obj`` to UTF-8 JSON bytes."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def json_dumps_line(obj) -> bytes:
+        """Serialize ``obj`` to one newline-terminated JSONL record."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+    def json_dumps(obj) -> str:
+        """Serialize ``obj`` to a JSON string (non-ASCII kept as is)."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    json_loads = orjson.loads
+else:
+    JSONDecodeError = json.JSONDecodeError
+
+    def json_dumps_bytes(obj) -> bytes:
+        """Serialize ``obj`` to UTF-8 JSON bytes."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def json_dumps_line(obj) -> bytes:
+        """Serialize ``obj`` to one newline-terminated JSONL record."""
+        return (json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def json_dumps(obj) -> str:
+        """Serialize ``obj`` to a JSON string (non-ASCII kept as is)."""
+        return json.dumps(obj, ensure_ascii=False)
+
+    json_loads = json.loads
+
+
+async def gather(*aws, max_inflight: int = 4, return_exceptions: bool = False):
+    """asyncio.gather with at most ``max_inflight`` awaitables running at once."""
+    import asyncio
+    semaphore = asyncio.Semaphore(max_inflight)
+
+    async def _limited(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(_limited(aw) for aw in aws), return_exceptions=return_exceptions)
+
+
+# Persistent event loop for sync entry points. Clients cached across calls (genai, aiohttp)
+# keep pooled connections bound to the loop they first ran on, so every sync call reuses
+# this loop instead of starting and closing a fresh one with asyncio.run()
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+
+def _get_background_loop():
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            import asyncio
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="forgeoagent-loop", daemon=True).start()
+            _background_loop = loop
+        return _background_loop
+
+
+def run_coroutine_sync(coro):
+    """Run ``coro`` to completion from sync code on the shared background event loop.
+
+    Works whether or not this thread already runs an event loop. A blocking call made
+    from a coroutine that itself runs on the background loop (which would deadlock)
+    falls back to a private loop in a worker thread.
+    """
+    import asyncio
+    loop = _get_background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is not loop:
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, coro).result()
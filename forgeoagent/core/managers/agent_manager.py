@@ -3,11 +3,15 @@ import json
 from typing import Dict, List, Any , Optional
 from datetime import datetime
 
+from forgeoagent.core.helpers import json_dumps_line, json_loads
+
 class AgentManager:
     """Manages saving and loading of agents."""
     
-    def __init__(self, agents_dir: str = f"{os.path.join(os.path.dirname(__file__))}/../../mcp/executor_context_previous_conversation"):
+    def __init__(self, agents_dir: str = f"{os.path.join(os.path.dirname(__file__))}/../../mcp/executor_context_previous_conversation", logs_dir: Optional[str] = None):
         self.agents_dir = agents_dir
+        # Executor conversation logs read by save_agent; defaults to the logs/executor folder next to agents_dir
+        self.logs_dir = logs_dir or f"{agents_dir}/../../logs/executor"
         os.makedirs(agents_dir, exist_ok=True)
     
     def save_agent(self, agent_name: str, conversation_id: str, task_ids: List[str] = None) -> bool:
@@ -17,14 +21,14 @@ class AgentManager:
             os.makedirs(agent_folder, exist_ok=True)
             
             # Read the log file and get only the last main agent interaction
-            log_file = f"{self.agents_dir}/../../logs/executor/{conversation_id}.jsonl"
+            log_file = os.path.join(self.logs_dir, f"{conversation_id}.jsonl")
             if os.path.exists(log_file):
                 last_interaction = None
                 
-                with open(log_file, 'r', encoding='utf-8') as src:
+                with open(log_file, 'rb') as src:
                     for line in src:
                         try:
-                            data = json.loads(line)
+                            data = json_loads(line)
                             if data.get('type') == 'interaction' and data.get('success'):
                                 last_interaction = data
                         except:
@@ -33,19 +37,17 @@ class AgentManager:
                 if last_interaction:
                     # Save only the last successful interaction to main_agent.jsonl
                     agent_log_file = os.path.join(agent_folder, "main_agent.jsonl")
-                    with open(agent_log_file, 'w', encoding='utf-8') as dst:
-                        # Write metadata first
-                        metadata = {
-                            "type": "metadata",
-                            "agent_name": agent_name,
-                            "conversation_id": conversation_id,
-                            "saved_at": datetime.now().isoformat(),
-                            "model": "gemini-1.5-flash"
-                        }
-                        dst.write(json.dumps(metadata, ensure_ascii=False) + "\n")
-                        
-                        # Write the last interaction
-                        dst.write(json.dumps(last_interaction, ensure_ascii=False) + "\n")
+                    saved_at = datetime.now().isoformat()
+                    # Metadata line first, then the last interaction, serialized up front and written at once
+                    metadata = {
+                        "type": "metadata",
+                        "agent_name": agent_name,
+                        "conversation_id": conversation_id,
+                        "saved_at": saved_at,
+                        "model": "gemini-1.5-flash"
+                    }
+                    with open(agent_log_file, 'wb') as dst:
+                        dst.write(json_dumps_line(metadata) + json_dumps_line(last_interaction))
                     
                     # Also save individual task agent logs if they exist
                     task_logs_saved = []
@@ -66,7 +68,7 @@ class AgentManager:
                         "agent_name": agent_name,
                         "conversation_id": conversation_id,
                         "task_ids": task_ids or [],
-                        "saved_at": datetime.now().isoformat(),
+                        "saved_at": saved_at,
                         "log_file": "main_agent.jsonl",
                         "task_log_files": task_logs_saved
                     }
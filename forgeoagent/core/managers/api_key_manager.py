@@ -1,8 +1,39 @@
+import os
+import time
 import threading
 from typing import Dict, List, Any
 from datetime import datetime, date
 
 
+class _TokenBucket:
+    """Per-key request budget refilled from monotonic time deltas (no background task).
+
+    Tokens may go negative: a caller takes its token immediately and is told how long
+    to wait, so concurrent callers queue up locally instead of collecting 429s.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def available(self, now: float) -> float:
+        return min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+
+    def take(self, now: float) -> float:
+        """Take one token and return the seconds to wait before using it."""
+        self.tokens = self.available(now) - 1
+        self.updated = now
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+def _read_rpm() -> float:
+    try:
+        return float(os.environ.get("GEMINI_RPM", "0"))
+    except ValueError:
+        return 0.0
+
+
 class GlobalAPIKeyManager:
     """Singleton class for managing API keys with error handling and rotation."""
     _instance = None
@@ -12,6 +43,11 @@ class GlobalAPIKeyManager:
     _lock = threading.Lock()
     _usage_stats = {}
     _last_reset_date: date = None
+    # Client-side rate limit per key (GEMINI_RPM requests per minute); disabled when unset or 0
+    _buckets: Dict[str, _TokenBucket] = {}
+    _rpm: float = _read_rpm()
+    # Monotonic time before which a rate limited key should not be used (shared by all clients)
+    _cooldowns: Dict[str, float] = {}
     
     def __new__(cls):
         """To Make Class Singleton"""
@@ -85,6 +121,70 @@ class GlobalAPIKeyManager:
             cls._usage_stats[current_key]["requests"] += 1
             return current_key
     
+    @classmethod
+    def snapshot_active_keys(cls) -> List[str]:
+        """Return the usable keys in rotation order, starting from the current key.
+
+        The first key is counted as a request; callers walk the list locally and
+        only come back to the manager to report failures. The rotation advances on
+        every call, so concurrent requests are spread round-robin over all keys.
+        """
+        with cls._lock:
+            if not cls._api_keys:
+                raise Exception("No API keys initialized")
+            
+            cls._check_and_reset_daily()
+            
+            count = len(cls._api_keys)
+            active = [
+                cls._api_keys[(cls._current_index + i) % count]
+                for i in range(count)
+                if cls._api_keys[(cls._current_index + i) % count] not in cls._failed_keys
+            ]
+            if active:
+                cls._usage_stats[active[0]]["requests"] += 1
+                cls._current_index = (cls._api_keys.index(active[0]) + 1) % count
+            return active
+    
+    @classmethod
+    def reserve_key(cls, active_keys: List[str]) -> tuple:
+        """Pick the key to use next from ``active_keys`` and return ``(key, wait_seconds)``.
+
+        Without a GEMINI_RPM limit or cooling-down keys this is simply the first key.
+        Otherwise the key that is ready soonest (then with the most tokens left) is chosen
+        and a token is taken from it; callers sleep ``wait_seconds`` (``time.sleep`` or
+        ``asyncio.sleep``) before sending.
+        """
+        if cls._rpm <= 0 and not cls._cooldowns:
+            return active_keys[0], 0.0
+        with cls._lock:
+            now = time.monotonic()
+            for key in [key for key, until in cls._cooldowns.items() if until <= now]:
+                del cls._cooldowns[key]
+            if cls._rpm <= 0 and not cls._cooldowns:
+                return active_keys[0], 0.0
+            candidates = []
+            for key in active_keys:
+                cooldown = max(0.0, cls._cooldowns.get(key, now) - now)
+                if cls._rpm > 0:
+                    bucket = cls._buckets.get(key)
+                    if bucket is None:
+                        bucket = cls._buckets[key] = _TokenBucket(cls._rpm / 60.0, cls._rpm)
+                    candidates.append((cooldown, -bucket.available(now), key, bucket))
+                else:
+                    candidates.append((cooldown, 0.0, key, None))
+            cooldown, _, key, bucket = min(candidates, key=lambda item: item[:2])
+            wait = bucket.take(now) if bucket is not None else 0.0
+            return key, max(cooldown, wait)
+    
+    @classmethod
+    def defer_key(cls, api_key: str, seconds: float):
+        """Keep ``api_key`` out of use for ``seconds`` (e.g. the server's retryDelay after a 429)."""
+        with cls._lock:
+            until = time.monotonic() + seconds
+            if until > cls._cooldowns.get(api_key, 0.0):
+                cls._cooldowns[api_key] = until
+    
     @classmethod
     def mark_key_failed(cls, api_key: str, error_msg: str = ""):
         """Mark an API key as failed with error tracking."""
@@ -9,9 +9,10 @@ import sys
 import os
 
 from forgeoagent.config import (
-    MCP_TOOLS_LOG_DIR
+    MCP_TOOLS_LOG_DIR,
+    ensure_log_dirs
 )
-DEFAULT_LOG_NAME = f"{MCP_TOOLS_LOG_DIR}/../../logs/mcp_tools/{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+DEFAULT_LOG_NAME = os.path.join(MCP_TOOLS_LOG_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
 
 def _repo_logs_dir():
     # locate repository root (two parents up from this file: mcp/tools -> mcp -> repo)
@@ -29,6 +30,7 @@ def _append_log(entry: dict, log_file: Path = None):
         log_file = _repo_logs_dir() / DEFAULT_LOG_NAME
 
     try:
+        ensure_log_dirs()
         with open(log_file, "a", encoding="utf-8") as f:
             f.write(json.dumps(entry, default=str) + "\n")
     except Exception:
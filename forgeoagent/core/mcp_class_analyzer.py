@@ -9,6 +9,22 @@ dotenv.load_dotenv()
 from forgeoagent.core.managers import InstrumentModule
 
 class PyClassAnalyzer:
+    # Results are cached per directory and reused while the directory fingerprint is unchanged
+    _analysis_cache: Dict[str, tuple] = {}
+    _classes_cache: Dict[str, tuple] = {}
+
+    @staticmethod
+    def _dir_fingerprint(target_dir: str) -> int:
+        """Hash of (name, mtime, size) for the analyzable .py files in ``target_dir``."""
+        entries = []
+        with os.scandir(target_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".py") and not entry.name.startswith("__"):
+                    st = entry.stat()
+                    entries.append((entry.name, st.st_mtime_ns, st.st_size))
+        entries.sort()
+        return hash(tuple(entries))
+
     @staticmethod
     def _get_annotation_type(annotation: Optional[ast.expr]) -> str:
         if annotation is None:
@@ -87,6 +103,13 @@ class PyClassAnalyzer:
             print(f"[!] Provided path is not a directory: {target_dir}")
             return {}
 
+        cache_key = os.path.abspath(target_dir)
+        fingerprint = cls._dir_fingerprint(target_dir)
+        cached = cls._analysis_cache.get(cache_key)
+        if cached is not None and cached[0] == fingerprint:
+            return dict(cached[1]) if is_json else cached[2]
+
+        file_classes: Dict[str, List[str]] = {}
         for filename in os.listdir(target_dir):
             if filename.endswith(".py") and not filename.startswith("__"):
                 file_path = os.path.join(target_dir, filename)
@@ -102,11 +125,14 @@ class PyClassAnalyzer:
                         print(f"  [-] No classes found in {filename}")
                     else:
                         final_output.update(class_data)
+                        file_classes[filename] = list(class_data)
                 except Exception as e:
                     print(f"[!] Error processing {filename}: {e}")
+        output_json = json.dumps(final_output, indent=4)
+        cls._analysis_cache[cache_key] = (fingerprint, final_output, output_json, file_classes)
         if is_json:
-            return final_output
-        return json.dumps(final_output, indent=4)
+            return dict(final_output)
+        return output_json
 
     @classmethod
     def get_all_classes(cls, target_dir: str) -> Dict[str, Any]:
@@ -114,31 +140,45 @@ class PyClassAnalyzer:
         Analyze all .py files in the target_dir and return a dict of {class_name: class_reference}.
         """
         class_map = {}
-        analysis_result = cls.analyze_dir(target_dir, is_json=True)
-        for class_name in analysis_result:
-            for filename in os.listdir(target_dir):
-                if not filename.endswith(".py") or filename.startswith("__"):
+        if not os.path.isdir(target_dir):
+            print(f"[!] Provided path is not a directory: {target_dir}")
+            return class_map
+
+        cache_key = os.path.abspath(target_dir)
+        fingerprint = cls._dir_fingerprint(target_dir)
+        cached = cls._classes_cache.get(cache_key)
+        if cached is not None and cached[0] == fingerprint:
+            return dict(cached[1])
+
+        cls.analyze_dir(target_dir, is_json=True)
+        file_classes = cls._analysis_cache[cache_key][3]
+        # Execute each module once and pick up the classes it defines
+        for filename in sorted(file_classes):
+            file_path = os.path.join(target_dir, filename)
+            module_name = os.path.splitext(filename)[0]
+            wanted = [name for name in file_classes[filename] if name not in class_map]
+            if not wanted:
+                continue
+
+            try:
+                spec = importlib.util.spec_from_file_location(module_name, file_path)
+                if not spec or not spec.loader:
                     continue
-                file_path = os.path.join(target_dir, filename)
-                module_name = os.path.splitext(filename)[0]
-
-                try:
-                    spec = importlib.util.spec_from_file_location(module_name, file_path)
-                    if not spec or not spec.loader:
-                        continue
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
-
-                    if hasattr(module, class_name):
-                        class_obj = getattr(module, class_name)
-                        if os.getenv('ENV_STATUS','production') == 'development':
-                            InstrumentModule(class_obj)
-                        class_map[class_name] = class_obj
-                        break
-                except Exception as e:
-                    print(f"[!] Failed to load {class_name} from {filename}: {e}")
-
-        return class_map
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+            except Exception as e:
+                print(f"[!] Failed to load {', '.join(wanted)} from {filename}: {e}")
+                continue
+
+            for class_name in wanted:
+                if hasattr(module, class_name):
+                    class_obj = getattr(module, class_name)
+                    if os.getenv('ENV_STATUS','production') == 'development':
+                        InstrumentModule(class_obj)
+                    class_map[class_name] = class_obj
+
+        cls._classes_cache[cache_key] = (fingerprint, class_map)
+        return dict(class_map)
     
 if __name__ == "__main__":
     print(PyClassAnalyzer().get_all_classes("./forgeoagent/mcp/tools"))
@@ -35,13 +35,16 @@ class ODOO_REGEX:
         found_files = []
         
         try:
+            # Compile once; the same pattern is run against every file and later every line
+            pattern = re.compile(regex, re.IGNORECASE)
+            
             # First pass: collect all matching files with priority scoring
             for root, _, files in os.walk(search_path):
                 if '.venv' in root:
                     continue
                     
                 for file in files:
-                    if not (file.endswith(".py") or file.endswith(".xml") or file.endswith(".js")):
+                    if not file.endswith((".py", ".xml", ".js")):
                         continue
                     
                     file_path = os.path.join(root, file)
@@ -50,7 +53,7 @@ class ODOO_REGEX:
                         with open(file_path, 'r', encoding='utf-8') as f:
                             content = f.read()
                             
-                            if re.search(regex, content, re.IGNORECASE):
+                            if pattern.search(content):
                                 # Calculate priority score
                                 priority = self._calculate_priority(file_path, near_path)
                                 found_files.append({
@@ -83,7 +86,7 @@ class ODOO_REGEX:
                     }
                 else:
                     # Return context around matches for remaining files
-                    context = self._extract_context(content, regex, context_lines)
+                    context = self._extract_context(content, pattern, context_lines)
                     result[file_path] = {
                         'content': context,
                         'full_code': False,
@@ -136,19 +139,20 @@ class ODOO_REGEX:
         
         Args:
             content (str): File content.
-            regex (str): Regular expression to search for.
+            regex (str | re.Pattern): Regular expression to search for (case-insensitive when given as str).
             context_lines (int): Number of lines before and after match.
         
         Returns:
             str: Extracted context around matches.
         """
+        pattern = regex if isinstance(regex, re.Pattern) else re.compile(regex, re.IGNORECASE)
         lines = content.split('\n')
         matched_ranges = set()
         result_lines = []
         
         # Find all matching line numbers
         for i, line in enumerate(lines):
-            if re.search(regex, line, re.IGNORECASE):
+            if pattern.search(line):
                 start = max(0, i - context_lines)
                 end = min(len(lines), i + context_lines + 1)
                 
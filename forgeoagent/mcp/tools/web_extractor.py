@@ -5,15 +5,22 @@ Web Extractor Tool
 Simple web scraping and browser launching:
 1. scrape_html(url) - Extract HTML using requests + BeautifulSoup
 2. launch_browser(url) - Launch Playwright page for master worker to control
+3. async_launch_browser(url) - Same with the async API, for driving several pages concurrently
 """
 
+import asyncio
+import functools
 import logging
 from typing import Dict, List, Optional, Any
 from urllib.parse import urljoin
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 
+from forgeoagent.core.helpers import HTML_PARSER, decode_html_response
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,11 +28,15 @@ logger = logging.getLogger(__name__)
 # Optional Playwright import
 try:
     from playwright.sync_api import sync_playwright, Page
+    from playwright.async_api import async_playwright
     PLAYWRIGHT_AVAILABLE = True
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
     logger.warning("Playwright not installed.")
 
+# Chromium flags for the shared browser (/dev/shm is tiny in containers)
+BROWSER_ARGS = ['--disable-dev-shm-usage']
+
 
 class WebExtractor:
     """
@@ -40,62 +51,73 @@ class WebExtractor:
             headless: Whether to run browser headless (False shows browser)
         """
         self.headless = headless
+        # One browser per API is started on first use and shared by every page
         self._playwright = None
         self._browser = None
+        self._async_playwright = None
+        self._async_browser = None
+        self._async_launch_lock = asyncio.Lock()
+        
+        # Keep-alive connection pool reused by every scrape_html call
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0'
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=Retry(total=2, backoff_factor=0.2))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
     
     # =====================
     # Scraping (requests + bs4)
     # =====================
     
-    def scrape_html(self, url: str, timeout: int = 30) -> Dict[str, Any]:
+    def scrape_html(self, url: str, timeout: int = 30, include_text: bool = True) -> Dict[str, Any]:
         """
         Scrape HTML from URL using requests + BeautifulSoup.
         
         Args:
             url: URL to scrape
             timeout: Request timeout
+            include_text: Whether to extract the page's visible text (set False when only
+                links/images/assets are needed; 'text' is then None)
             
         Returns:
             Dict with: success, url, title, html, text, links, images, css, js
         """
         try:
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0'}
-            response = requests.get(url, headers=headers, timeout=timeout)
+            response = self.session.get(url, timeout=timeout)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            html_text = decode_html_response(response)
+            soup = BeautifulSoup(html_text, HTML_PARSER)
             title = soup.title.string if soup.title else ''
+            # Resolve relative URLs against the page; hrefs repeated on the page (nav, icons) are joined once
+            absolute = functools.lru_cache(maxsize=None)(functools.partial(urljoin, url))
             
-            # Extract CSS
-            css_list = []
-            for style in soup.find_all('style'):
-                css_list.append({'type': 'inline', 'content': style.string or ''})
-            for link in soup.find_all('link', rel='stylesheet'):
-                if link.get('href'):
-                    css_list.append({'type': 'external', 'url': urljoin(url, link['href'])})
-            
-            # Extract JS
-            js_list = []
-            for script in soup.find_all('script'):
-                if script.get('src'):
-                    js_list.append({'type': 'external', 'url': urljoin(url, script['src'])})
-                elif script.string:
-                    js_list.append({'type': 'inline', 'content': script.string})
-            
-            # Extract links
-            links = [{'text': a.get_text(strip=True), 'url': urljoin(url, a['href'])} 
-                     for a in soup.find_all('a', href=True)]
-            
-            # Extract images
-            images = [{'src': urljoin(url, img['src']), 'alt': img.get('alt', '')} 
-                      for img in soup.find_all('img', src=True)]
+            # Extract CSS, JS, links and images in one walk over the tree (lists keep document order)
+            css_list, js_list, links, images = [], [], [], []
+            for tag in soup.find_all(['style', 'link', 'script', 'a', 'img']):
+                name = tag.name
+                if name == 'a':
+                    if 'href' in tag.attrs:
+                        links.append({'text': tag.get_text(strip=True), 'url': absolute(tag['href'])})
+                elif name == 'img':
+                    if 'src' in tag.attrs:
+                        images.append({'src': absolute(tag['src']), 'alt': tag.get('alt', '')})
+                elif name == 'style':
+                    css_list.append({'type': 'inline', 'content': tag.string or ''})
+                elif name == 'link':
+                    if 'stylesheet' in (tag.get('rel') or []) and tag.get('href'):
+                        css_list.append({'type': 'external', 'url': absolute(tag['href'])})
+                elif tag.get('src'):
+                    js_list.append({'type': 'external', 'url': absolute(tag['src'])})
+                elif tag.string:
+                    js_list.append({'type': 'inline', 'content': tag.string})
             
             return {
                 'success': True,
                 'url': url,
                 'title': title,
-                'html': response.text,
-                'text': soup.get_text(separator='\n', strip=True),
+                'html': html_text,
+                'text': soup.get_text(separator='\n', strip=True) if include_text else None,
                 'links': links,
                 'images': images,
                 'css': css_list,
@@ -112,9 +134,13 @@ class WebExtractor:
     
     def launch_browser(self, url: str = None) -> Optional['Page']:
         """
-        Launch Playwright browser and optionally navigate to URL.
+        Open a new page in the shared Playwright browser and optionally navigate to URL.
         Returns the Page object for master worker to control.
         
+        The browser is launched on the first call and reused afterwards; each page gets
+        its own context (cookies, storage). Call close_page(page) when done with a page
+        and close_browser() to shut the browser down.
+        
         Args:
             url: Optional URL to navigate to
             
@@ -126,21 +152,38 @@ class WebExtractor:
             return None
         
         try:
-            self._playwright = sync_playwright().start()
-            self._browser = self._playwright.chromium.launch(headless=self.headless)
-            page = self._browser.new_page()
+            if self._browser is None:
+                self._playwright = sync_playwright().start()
+                self._browser = self._playwright.chromium.launch(headless=self.headless, args=BROWSER_ARGS)
+        except Exception as e:
+            logger.error(f"Browser launch error: {e}")
+            self.close_browser()
+            return None
+        
+        context = None
+        try:
+            context = self._browser.new_context()
+            page = context.new_page()
             
             if url:
                 page.goto(url, wait_until='domcontentloaded')
             
-            logger.info(f"Browser launched. Page returned for master worker.")
+            logger.info(f"Browser page opened. Page returned for master worker.")
             return page
             
         except Exception as e:
-            logger.error(f"Browser launch error: {e}")
-            self.close_browser()
+            logger.error(f"Browser page error: {e}")
+            if context is not None:
+                context.close()
             return None
     
+    def close_page(self, page: 'Page'):
+        """Close a page from launch_browser (and its context) while keeping the browser running."""
+        try:
+            page.context.close()
+        except Exception as e:
+            logger.error(f"Close page error: {e}")
+    
     def close_browser(self):
         """Close browser and cleanup."""
         try:
@@ -152,7 +195,69 @@ class WebExtractor:
                 self._playwright = None
         except Exception as e:
             logger.error(f"Close error: {e}")
-
+    
+    async def async_launch_browser(self, url: str = None):
+        """
+        Async launch_browser: open a page in a shared browser driven by Playwright's async API.
+        
+        Pages are independent, so several can be opened and driven concurrently
+        (e.g. with asyncio.gather). All calls must come from the same event loop.
+        
+        Args:
+            url: Optional URL to navigate to
+            
+        Returns:
+            Playwright async Page object, or None on error
+        """
+        if not PLAYWRIGHT_AVAILABLE:
+            logger.error("Playwright not installed. Run: pip install playwright && playwright install")
+            return None
+        
+        try:
+            # Concurrent first calls must not each start a browser
+            async with self._async_launch_lock:
+                if self._async_browser is None:
+                    self._async_playwright = await async_playwright().start()
+                    self._async_browser = await self._async_playwright.chromium.launch(headless=self.headless, args=BROWSER_ARGS)
+        except Exception as e:
+            logger.error(f"Browser launch error: {e}")
+            await self.async_close_browser()
+            return None
+        
+        context = None
+        try:
+            context = await self._async_browser.new_context()
+            page = await context.new_page()
+            
+            if url:
+                await page.goto(url, wait_until='domcontentloaded')
+            
+            return page
+            
+        except Exception as e:
+            logger.error(f"Browser page error: {e}")
+            if context is not None:
+                await context.close()
+            return None
+    
+    async def async_close_page(self, page):
+        """Close a page from async_launch_browser (and its context) while keeping the browser running."""
+        try:
+            await page.context.close()
+        except Exception as e:
+            logger.error(f"Close page error: {e}")
+    
+    async def async_close_browser(self):
+        """Close the async browser and cleanup."""
+        try:
+            if self._async_browser:
+                await self._async_browser.close()
+                self._async_browser = None
+            if self._async_playwright:
+                await self._async_playwright.stop()
+                self._async_playwright = None
+        except Exception as e:
+            logger.error(f"Close error: {e}")
 
 if __name__ == "__main__":
     extractor = WebExtractor()
@@ -14,14 +14,98 @@ Usage:
     # Visit http://localhost:8888/preview
 """
 
+import hashlib
 import threading
 import logging
+from dataclasses import dataclass
 from typing import Optional
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Home page served by the preview server ({port} and {status} are filled in once per server start)
+_HOME_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Web Viewer</title>
+    <style>
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        body {{ 
+            font-family: 'Segoe UI', system-ui, sans-serif;
+            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
+            min-height: 100vh;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            color: #e0e0e0;
+        }}
+        .container {{
+            text-align: center;
+            padding: 40px;
+            background: rgba(255, 255, 255, 0.05);
+            border-radius: 20px;
+            backdrop-filter: blur(10px);
+            border: 1px solid rgba(255, 255, 255, 0.1);
+        }}
+        h1 {{ 
+            font-size: 2.5rem;
+            margin-bottom: 20px;
+            background: linear-gradient(90deg, #00d4ff, #7c3aed);
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+        }}
+        .status {{
+            display: inline-flex;
+            align-items: center;
+            gap: 10px;
+            background: rgba(16, 185, 129, 0.2);
+            padding: 10px 20px;
+            border-radius: 30px;
+            margin-bottom: 20px;
+        }}
+        .info {{ 
+            margin-top: 20px;
+            padding: 20px;
+            background: rgba(0, 0, 0, 0.3);
+            border-radius: 12px;
+        }}
+        code {{ background: rgba(124, 58, 237, 0.3); padding: 4px 10px; border-radius: 6px; }}
+        a {{ color: #00d4ff; text-decoration: none; }}
+        a:hover {{ text-decoration: underline; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🌐 Web Viewer</h1>
+        <div class="status"><span>Server Running on Port {port}</span></div>
+        <div class="info">
+            <p>Use <code>viewer.render(html)</code> to set content</p>
+            <p style="margin-top: 10px;">Then visit <a href="/preview">/preview</a></p>
+            <p style="margin-top: 15px;">{status}</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+_STATUS_WITH_CONTENT = '✅ Content ready - <a href="/preview">View Preview</a>'
+_STATUS_WITHOUT_CONTENT = '⏳ No content set yet'
+_NO_CONTENT_HTML = b"<html><body><h1>No Content</h1><p>Use viewer.render(html) first</p></body></html>"
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """Content served by the preview server; render() swaps in a new one, handlers read one reference."""
+    html: Optional[str] = None
+    html_bytes: Optional[bytes] = None
+    etag: Optional[str] = None
+    title: str = "Web Viewer Preview"
+
+
+_EMPTY_SNAPSHOT = _Snapshot()
+
 
 class WebViewer:
     """
@@ -32,12 +116,27 @@ class WebViewer:
     
     def __init__(self):
         """Initialize the WebViewer."""
-        self.current_html: Optional[str] = None
-        self.current_title: str = "Web Viewer Preview"
+        # Replaced as a whole (never mutated), so server threads never see half-updated content
+        self._snapshot: _Snapshot = _EMPTY_SNAPSHOT
         self._server_thread: Optional[threading.Thread] = None
         self._server_running: bool = False
         self._port: int = 8888
     
+    @property
+    def current_html(self) -> Optional[str]:
+        return self._snapshot.html
+    
+    @current_html.setter
+    def current_html(self, html_content: Optional[str]):
+        if html_content is None:
+            self._snapshot = _Snapshot(title=self._snapshot.title)
+        else:
+            self.render(html_content)
+    
+    @property
+    def current_title(self) -> str:
+        return self._snapshot.title
+    
     def render(self, html_content: str, title: str = None) -> str:
         """
         Set HTML content to be displayed on the preview server.
@@ -49,16 +148,19 @@ class WebViewer:
         Returns:
             Preview URL path
         """
-        self.current_html = html_content
-        if title:
-            self.current_title = title
+        html_bytes = html_content.encode('utf-8')
+        self._snapshot = _Snapshot(
+            html=html_content,
+            html_bytes=html_bytes,
+            etag=f'"{hashlib.blake2b(html_bytes, digest_size=16).hexdigest()}"',
+            title=title or self._snapshot.title
+        )
         logger.info(f"📄 HTML content set for preview ({len(html_content)} chars)")
         return f"http://localhost:{self._port}/preview"
     
     def clear(self):
         """Clear the current HTML content."""
-        self.current_html = None
-        self.current_title = "Web Viewer Preview"
+        self._snapshot = _EMPTY_SNAPSHOT
     
     def start(self, port: int = 8888, background: bool = False):
         """
@@ -85,8 +187,8 @@ class WebViewer:
     def _run_server(self, port: int):
         """Internal method to run the FastAPI server."""
         try:
-            from fastapi import FastAPI
-            from fastapi.responses import HTMLResponse
+            from fastapi import FastAPI, Request
+            from fastapi.responses import HTMLResponse, Response
             import uvicorn
         except ImportError:
             logger.error("FastAPI/uvicorn not installed. Run: pip install fastapi uvicorn")
@@ -95,85 +197,28 @@ class WebViewer:
         app = FastAPI(title="Web Viewer")
         self._server_running = True
         
+        # The home page only depends on the port and on whether content is set: encode both variants once
+        home_with_content = _HOME_TEMPLATE.format(port=port, status=_STATUS_WITH_CONTENT).encode('utf-8')
+        home_without_content = _HOME_TEMPLATE.format(port=port, status=_STATUS_WITHOUT_CONTENT).encode('utf-8')
+        
         @app.get("/", response_class=HTMLResponse)
         async def home():
-            has_content = bool(self.current_html)
-            return f"""
-            <!DOCTYPE html>
-            <html lang="en">
-            <head>
-                <meta charset="UTF-8">
-                <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                <title>Web Viewer</title>
-                <style>
-                    * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-                    body {{ 
-                        font-family: 'Segoe UI', system-ui, sans-serif;
-                        background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
-                        min-height: 100vh;
-                        display: flex;
-                        align-items: center;
-                        justify-content: center;
-                        color: #e0e0e0;
-                    }}
-                    .container {{
-                        text-align: center;
-                        padding: 40px;
-                        background: rgba(255, 255, 255, 0.05);
-                        border-radius: 20px;
-                        backdrop-filter: blur(10px);
-                        border: 1px solid rgba(255, 255, 255, 0.1);
-                    }}
-                    h1 {{ 
-                        font-size: 2.5rem;
-                        margin-bottom: 20px;
-                        background: linear-gradient(90deg, #00d4ff, #7c3aed);
-                        -webkit-background-clip: text;
-                        -webkit-text-fill-color: transparent;
-                    }}
-                    .status {{
-                        display: inline-flex;
-                        align-items: center;
-                        gap: 10px;
-                        background: rgba(16, 185, 129, 0.2);
-                        padding: 10px 20px;
-                        border-radius: 30px;
-                        margin-bottom: 20px;
-                    }}
-                    .info {{ 
-                        margin-top: 20px;
-                        padding: 20px;
-                        background: rgba(0, 0, 0, 0.3);
-                        border-radius: 12px;
-                    }}
-                    code {{ background: rgba(124, 58, 237, 0.3); padding: 4px 10px; border-radius: 6px; }}
-                    a {{ color: #00d4ff; text-decoration: none; }}
-                    a:hover {{ text-decoration: underline; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <h1>🌐 Web Viewer</h1>
-                    <div class="status"><span>Server Running on Port {port}</span></div>
-                    <div class="info">
-                        <p>Use <code>viewer.render(html)</code> to set content</p>
-                        <p style="margin-top: 10px;">Then visit <a href="/preview">/preview</a></p>
-                        <p style="margin-top: 15px;">{'✅ Content ready - <a href="/preview">View Preview</a>' if has_content else '⏳ No content set yet'}</p>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """
+            return Response(content=home_with_content if self._snapshot.html_bytes else home_without_content, media_type="text/html")
         
         @app.get("/preview", response_class=HTMLResponse)
-        async def preview():
-            if self.current_html:
-                return self.current_html
-            return "<html><body><h1>No Content</h1><p>Use viewer.render(html) first</p></body></html>"
+        async def preview(request: Request):
+            snapshot = self._snapshot
+            if not snapshot.html_bytes:
+                return Response(content=_NO_CONTENT_HTML, media_type="text/html")
+            # Reloads of unchanged content get an empty 304
+            headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+            if request.headers.get("if-none-match") == snapshot.etag:
+                return Response(status_code=304, headers=headers)
+            return Response(content=snapshot.html_bytes, media_type="text/html", headers=headers)
         
         @app.get("/health")
         async def health():
-            return {"status": "ok", "has_content": bool(self.current_html)}
+            return {"status": "ok", "has_content": bool(self._snapshot.html_bytes)}
         
         logger.info(f"🚀 Web Viewer starting on http://localhost:{port}")
         
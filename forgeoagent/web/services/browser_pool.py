@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Browser Pool Service
+
+Keeps a Playwright Chromium browser warm between image searches:
+- One browser per pool, launched on first use and closed after it has been idle for a while
+- Every acquire() gets a fresh, isolated context + page (cheap compared to a browser launch)
+- At most max_concurrent pages are open at once
+- All Playwright work runs on one background event loop, so the browser survives across
+  callers that would otherwise each start their own loop with asyncio.run()
+
+File: services/browser_pool.py
+"""
+
+import asyncio
+import atexit
+import contextlib
+import logging
+import threading
+from typing import Any, Coroutine, Dict, Optional
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+logger = logging.getLogger(__name__)
+
+# Chromium flags for pooled browsers (/dev/shm is tiny in containers)
+BROWSER_ARGS = ['--disable-dev-shm-usage']
+
+
+class BrowserPool:
+    """
+    Pool of warm browser pages served from a persistent background event loop.
+
+    Usage from sync code:
+        pool = get_browser_pool(headless=True)
+        result = pool.run(some_coroutine(pool))   # inside: async with pool.acquire() as page: ...
+    """
+
+    def __init__(self, headless: bool = True, max_concurrent: int = 5, max_idle_time: float = 300.0):
+        """
+        Args:
+            headless: Whether to run the browser without a visible window
+            max_concurrent: Maximum number of pages open at the same time
+            max_idle_time: Seconds without open pages after which the browser is closed
+        """
+        self.headless = headless
+        self.max_concurrent = max_concurrent
+        self.max_idle_time = max_idle_time
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        # The fields below are only touched from the pool's loop
+        self._playwright = None
+        self._browser = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._open_pages = 0
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop thread on first use."""
+        with self._thread_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name="browser-pool", daemon=True)
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coroutine: Coroutine) -> Any:
+        """Run a coroutine on the pool's loop and wait for its result (works in sync and async contexts)."""
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coroutine.close()
+            raise RuntimeError("BrowserPool.run() cannot be called from the pool's own event loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    async def _get_browser(self):
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        async with self._launch_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if async_playwright is None:
+                    raise RuntimeError("Playwright is not installed. Install it with 'pip install playwright' and run 'playwright install'.")
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless, args=BROWSER_ARGS)
+                logger.info("Browser started successfully")
+        return self._browser
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        """Yield a new page in its own context from the warm browser; the context is closed on exit."""
+        browser = await self._get_browser()
+        async with self._semaphore:
+            self._open_pages += 1
+            if self._idle_handle is not None:
+                self._idle_handle.cancel()
+                self._idle_handle = None
+            context = None
+            try:
+                context = await browser.new_context()
+                yield await context.new_page()
+            finally:
+                if context is not None:
+                    with contextlib.suppress(Exception):
+                        await context.close()
+                self._open_pages -= 1
+                if self._open_pages == 0:
+                    self._idle_handle = asyncio.get_running_loop().call_later(
+                        self.max_idle_time, lambda: asyncio.ensure_future(self._close_if_idle())
+                    )
+
+    async def _close_if_idle(self):
+        self._idle_handle = None
+        if self._open_pages == 0:
+            await self._close_browser()
+            logger.info("Browser closed after being idle")
+
+    async def _close_browser(self):
+        browser, playwright = self._browser, self._playwright
+        self._browser = self._playwright = None
+        with contextlib.suppress(Exception):
+            if browser is not None:
+                await browser.close()
+        with contextlib.suppress(Exception):
+            if playwright is not None:
+                await playwright.stop()
+
+    def close(self):
+        """Close the browser now (it is relaunched on the next acquire)."""
+        if self._loop is not None and self._loop.is_running():
+            with contextlib.suppress(Exception):
+                asyncio.run_coroutine_threadsafe(self._close_browser(), self._loop).result(timeout=10)
+
+
+# Shared pools, one per headless setting
+_pools: Dict[bool, BrowserPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_browser_pool(headless: bool = True) -> BrowserPool:
+    """Return the process-wide browser pool for the given headless setting."""
+    with _pools_lock:
+        pool = _pools.get(headless)
+        if pool is None:
+            pool = _pools[headless] = BrowserPool(headless=headless)
+        return pool
+
+
+@atexit.register
+def _close_pools():
+    for pool in list(_pools.values()):
+        pool.close()
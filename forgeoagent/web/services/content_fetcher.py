@@ -12,26 +12,349 @@ This module provides functionality to fetch content with images using multiple s
 File: services/content_fetcher.py
 """
 
-import base64
+import re
 import requests
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Iterator, List, Dict, Optional
 from forgeoagent.clients.gemini_engine import GeminiAPIClient
+from forgeoagent.core.helpers import HTML_PARSER, JSONDecodeError, decode_html_response, json_loads
+from forgeoagent.web.services.browser_pool import BrowserPool, get_browser_pool
 from google.genai import types
 from google import genai
 import json
 from urllib.parse import quote, urlparse, parse_qs, unquote
 import logging
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import asyncio
+import atexit
+import concurrent.futures
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 
 try:
-    from playwright.async_api import async_playwright, Browser, Page, TimeoutError as PlaywrightTimeoutError
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 except ImportError:
     print("Playwright is not installed. Please install it with 'pip install playwright' and run 'playwright install'.")
+
+# Optional: C (Lexbor) HTML parser for the large Google Images result pages; BeautifulSoup otherwise
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Optional: SIMD base64 encoder for image payloads
+try:
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
+
+# Optional: concurrent image downloads on one event loop; falls back to a thread per download
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upper bound on simultaneous image downloads
+MAX_CONCURRENT_DOWNLOADS = 32
+
+# Pages clicking Google Images thumbnails at the same time, each loading the results once (also bounded by the browser pool)
+THUMBNAIL_WORKERS = 5
+
+_THUMBNAIL_SELECTOR = 'img[src], img[data-src]'
+
+# Picks the largest image shown in the Google Images preview panel
+_PREVIEW_IMAGE_JS = """
+    () => {
+        const imgs = document.querySelectorAll('img');
+        let bestImg = null;
+        let maxSize = 0;
+    
+        for (const img of imgs) {
+            if (img.src && img.src.startsWith('http') && 
+                img.naturalWidth * img.naturalHeight > maxSize) {
+            
+                // Check if it's in a dialog or preview container
+                const inDialog = img.closest('[role="dialog"]') || 
+                               img.closest('div[jsaction]');
+            
+                if (inDialog && img.naturalWidth > 200 && img.naturalHeight > 200) {
+                    maxSize = img.naturalWidth * img.naturalHeight;
+                    bestImg = img;
+                }
+            }
+        }
+    
+        if (bestImg) {
+            // Try to find source URL
+            let sourceUrl = '';
+            const linkElement = bestImg.closest('a');
+            if (linkElement) {
+                sourceUrl = linkElement.href || '';
+            }
+        
+            return {
+                image_url: bestImg.src,
+                image_title: bestImg.alt || 'No title',
+                source_url: sourceUrl,
+                width: bestImg.naturalWidth,
+                height: bestImg.naturalHeight
+            };
+        }
+        return null;
+    }
+"""
+
+# One keep-alive connection pool for search pages and image downloads (thumbnails mostly come from the same hosts)
+_http_session = requests.Session()
+_http_session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+_http_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=MAX_CONCURRENT_DOWNLOADS, max_retries=Retry(total=2, backoff_factor=0.2))
+_http_session.mount('https://', _http_adapter)
+_http_session.mount('http://', _http_adapter)
+
+# Body of a Markdown code fence (```json ... ```) around a model's JSON answer; an unclosed fence runs to the end
+_CODE_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*(?:```|$)", re.DOTALL)
+
+# Hrefs of result anchors on a Google Images page (everything except internal /search? links)
+_RESULT_ANCHOR_HREF = re.compile(r'^(?!/search\?)')
+
+def _iter_google_result_images(page_html: str) -> Iterator[tuple]:
+    """Yield ``(href, src, alt)`` for every image inside a result anchor (not a /search? link), in page order.
+
+    ``alt`` is None when the image has no alt attribute.
+    """
+    if LexborHTMLParser is not None:
+        for anchor in LexborHTMLParser(page_html).css('a[href]'):
+            href = anchor.attributes.get('href') or ''
+            if not _RESULT_ANCHOR_HREF.match(href):
+                continue
+            for image in anchor.css('img[src]'):
+                attributes = image.attributes
+                yield href, attributes.get('src') or '', attributes.get('alt')
+        return
+    
+    # Only result anchors (and the images inside them) are used; internal search links
+    # and the rest of the page are dropped while parsing instead of being built and skipped
+    soup = BeautifulSoup(page_html, HTML_PARSER, parse_only=SoupStrainer('a', href=_RESULT_ANCHOR_HREF))
+    for anchor in soup.find_all('a', href=_RESULT_ANCHOR_HREF):
+        for image in anchor.find_all('img', src=True):
+            yield anchor['href'], image['src'], image.get('alt')
+
+
+# Worker threads for blocking image downloads (without aiohttp), started on first use and kept warm
+_download_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_download_pool_lock = threading.Lock()
+
+
+def _get_download_pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _download_pool
+    with _download_pool_lock:
+        if _download_pool is None:
+            _download_pool = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS, thread_name_prefix="image-download")
+        return _download_pool
+
+
+# Image bodies are read and base64-encoded in chunks of this size (a multiple of 3, so chunks encode without padding)
+_DOWNLOAD_CHUNK_SIZE = 3 * 64 * 1024
+
+# LRU cache of downloaded images as data URIs, keyed by URL (thumbnails recur across searches and retries),
+# bounded by entry count and by the total size of the cached data URIs
+_IMAGE_CACHE_SIZE = 1024
+_IMAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_image_cache: "OrderedDict[str, str]" = OrderedDict()
+_image_cache_bytes = 0
+_image_cache_lock = threading.Lock()
+
+# Search result pages, keyed by URL: served from memory for SEARCH_PAGE_TTL_SECONDS, then
+# revalidated with If-None-Match / If-Modified-Since when the server sent an ETag or Last-Modified
+SEARCH_PAGE_TTL_SECONDS = 600
+_SEARCH_PAGE_CACHE_SIZE = 64
+
+
+@dataclass
+class _CachedPage:
+    html: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+_search_page_cache: "OrderedDict[str, _CachedPage]" = OrderedDict()
+_search_page_cache_lock = threading.Lock()
+
+
+class _DataURIEncoder:
+    """Incremental base64 data URI builder, so the raw image body never has to be held in full."""
+    
+    def __init__(self, content_type: Optional[str]):
+        self._buffer = bytearray(b"data:" + (content_type or 'image/jpeg').encode('utf-8') + b";base64,")
+        self._carry = b""
+    
+    def feed(self, chunk: bytes) -> None:
+        if self._carry:
+            chunk = self._carry + chunk
+        cut = len(chunk) - len(chunk) % 3
+        self._buffer += b64encode(memoryview(chunk)[:cut])
+        self._carry = bytes(chunk[cut:])
+    
+    def finish(self) -> str:
+        if self._carry:
+            self._buffer += b64encode(self._carry)
+            self._carry = b""
+        return self._buffer.decode('utf-8')
+
+
+def _cached_image(image_url: str) -> Optional[str]:
+    with _image_cache_lock:
+        data_uri = _image_cache.get(image_url)
+        if data_uri is not None:
+            _image_cache.move_to_end(image_url)
+        return data_uri
+
+
+def _cache_image(image_url: str, data_uri: str) -> None:
+    global _image_cache_bytes
+    if len(data_uri) > _IMAGE_CACHE_MAX_BYTES:
+        return
+    with _image_cache_lock:
+        previous = _image_cache.pop(image_url, None)
+        if previous is not None:
+            _image_cache_bytes -= len(previous)
+        _image_cache[image_url] = data_uri
+        _image_cache_bytes += len(data_uri)
+        while len(_image_cache) > _IMAGE_CACHE_SIZE or _image_cache_bytes > _IMAGE_CACHE_MAX_BYTES:
+            _image_cache_bytes -= len(_image_cache.popitem(last=False)[1])
+
+
+def _fetch_search_page(search_url: str, request_timeout_seconds: int = 10) -> str:
+    """Return the decoded HTML of a search results page, reusing or revalidating a cached copy when possible.
+
+    Raises requests.RequestException like a plain GET with raise_for_status().
+    """
+    with _search_page_cache_lock:
+        cached = _search_page_cache.get(search_url)
+        if cached is not None:
+            _search_page_cache.move_to_end(search_url)
+    now = time.monotonic()
+    if cached is not None and now - cached.fetched_at < SEARCH_PAGE_TTL_SECONDS:
+        logger.info(f"Using cached page source for: {search_url}")
+        return cached.html
+    
+    conditional_headers = {}
+    if cached is not None:
+        if cached.etag:
+            conditional_headers['If-None-Match'] = cached.etag
+        if cached.last_modified:
+            conditional_headers['If-Modified-Since'] = cached.last_modified
+    response = _http_session.get(search_url, timeout=request_timeout_seconds, headers=conditional_headers or None)
+    if cached is not None and conditional_headers and response.status_code == 304:
+        page = _CachedPage(cached.html, now, response.headers.get('ETag') or cached.etag,
+                           response.headers.get('Last-Modified') or cached.last_modified)
+    else:
+        response.raise_for_status()
+        page = _CachedPage(decode_html_response(response), now, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    
+    with _search_page_cache_lock:
+        if 'no-store' in response.headers.get('Cache-Control', '').lower():
+            _search_page_cache.pop(search_url, None)
+        else:
+            _search_page_cache[search_url] = page
+            _search_page_cache.move_to_end(search_url)
+            if len(_search_page_cache) > _SEARCH_PAGE_CACHE_SIZE:
+                _search_page_cache.popitem(last=False)
+    return page.html
+
+
+def _image_content_type(image_url: str, headers) -> str:
+    """Return the response's image Content-Type (image/jpeg when missing), or raise before the body is read.
+
+    Catches the common case of an image link that actually serves an HTML page.
+    """
+    content_type = headers.get('Content-Type') or 'image/jpeg'
+    if not content_type.lower().startswith('image/'):
+        raise ValueError(f"{image_url} is not an image (Content-Type: {content_type})")
+    return content_type
+
+
+def _download_b64(image_url: str, request_timeout_seconds: int) -> str:
+    """Return the image at ``image_url`` as a data URI, from the cache when it was downloaded before.
+
+    Failures raise and are not cached, so a later call retries the URL.
+    """
+    data_uri = _cached_image(image_url)
+    if data_uri is None:
+        with _http_session.get(image_url, timeout=request_timeout_seconds, stream=True) as response:
+            response.raise_for_status()
+            encoder = _DataURIEncoder(_image_content_type(image_url, response.headers))
+            for chunk in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                encoder.feed(chunk)
+        data_uri = encoder.finish()
+        _cache_image(image_url, data_uri)
+    return data_uri
+
+
+# Background event loop owning the shared aiohttp session, so its keep-alive connections
+# outlive each call instead of being torn down with a per-call event loop
+_download_loop: Optional[asyncio.AbstractEventLoop] = None
+_download_loop_lock = threading.Lock()
+_aiohttp_session = None
+
+
+def _get_download_loop() -> asyncio.AbstractEventLoop:
+    global _download_loop
+    with _download_loop_lock:
+        if _download_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="image-download-loop", daemon=True).start()
+            _download_loop = loop
+        return _download_loop
+
+
+def _get_aiohttp_session():
+    """Return the shared aiohttp session, creating it on first use (call on the download loop only)."""
+    global _aiohttp_session
+    if _aiohttp_session is None or _aiohttp_session.closed:
+        _aiohttp_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=MAX_CONCURRENT_DOWNLOADS),
+            headers={'User-Agent': _http_session.headers['User-Agent']},
+        )
+    return _aiohttp_session
+
+
+async def _fetch_images_aiohttp(image_urls: List[str], request_timeout_seconds: int) -> List[Optional[str]]:
+    """Download images concurrently over the shared aiohttp session (runs on the download loop)."""
+    session = _get_aiohttp_session()
+    return await asyncio.gather(*(_fetch_image_async(session, image_url, request_timeout_seconds) for image_url in image_urls))
+
+
+@atexit.register
+def _close_aiohttp_session():
+    if _aiohttp_session is not None and not _aiohttp_session.closed and _download_loop is not None:
+        try:
+            asyncio.run_coroutine_threadsafe(_aiohttp_session.close(), _download_loop).result(timeout=5)
+        except Exception:
+            pass
+
+
+async def _fetch_image_async(session, image_url: str, request_timeout_seconds: int) -> Optional[str]:
+    """Download one image with aiohttp and return it as a data URI, or None on failure."""
+    try:
+        async with session.get(image_url, timeout=aiohttp.ClientTimeout(total=request_timeout_seconds)) as response:
+            response.raise_for_status()
+            encoder = _DataURIEncoder(_image_content_type(image_url, response.headers))
+            async for chunk in response.content.iter_chunked(_DOWNLOAD_CHUNK_SIZE):
+                encoder.feed(chunk)
+            return encoder.finish()
+    except Exception as e:
+        logger.error(f"Error fetching image from {image_url}: {e}")
+        return None
+
 class ContentImageFetcher:
     """
     Unified image fetcher that combines multiple extraction methods:
@@ -58,8 +381,6 @@ class ContentImageFetcher:
         self.gemini_api_keys = gemini_api_keys
         self.headless = headless
         self.default_timeout_ms = default_timeout_ms
-        self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
         
         self.gemini_system_prompt = (
             "Give relevant topic working images links and title based on the given description. "
@@ -92,47 +413,32 @@ class ContentImageFetcher:
             # output_required=self.gemini_output_required_fields
         )
     
-    async def _initialize_browser(self):
-        """
-        Initialize and start the Playwright browser instance.
-        
-        Creates a new Chromium browser and page if not already initialized.
-        """
-        if not self.browser:
-            playwright = await async_playwright().start()
-            self.browser = await playwright.chromium.launch(headless=self.headless)
-            self.page = await self.browser.new_page()
-            logger.info("Browser started successfully")
-    
-    async def _terminate_browser(self):
-        """
-        Close and cleanup the browser instance.
-        
-        Properly closes the browser and resets instance variables.
-        """
-        if self.browser:
-            await self.browser.close()
-            self.browser = None
-            self.page = None
-            logger.info("Browser closed")
+    @property
+    def pool(self) -> BrowserPool:
+        """Warm browser shared by all fetchers with the current headless setting."""
+        return get_browser_pool(self.headless)
     
     async def _extract_high_quality_images_async(
         self, 
         search_query: str, 
-        max_image_count: int = 10
+        max_image_count: int = 10,
+        pool: Optional[BrowserPool] = None
     ) -> List[Dict[str, str]]:
         """
         Extract high-quality images from Google Images by clicking on thumbnails (async).
         
         This method automates the process of:
         1. Navigating to Google Images with the search query
-        2. Finding and clicking on image thumbnails
-        3. Extracting the high-resolution image from the preview window
+        2. Finding the image thumbnails
+        3. Clicking thumbnails and extracting the high-resolution image from the preview
+           window, spread over up to THUMBNAIL_WORKERS pooled pages that each load the
+           results once and click several thumbnails
         4. Collecting metadata (title, source URL)
         
         Args:
             search_query: The search query for Google Images
             max_image_count: Maximum number of images to extract
+            pool: Browser pool to use (defaults to the one for the current headless setting)
             
         Returns:
             List of dictionaries containing:
@@ -140,136 +446,122 @@ class ContentImageFetcher:
                 - image_title: Title/alt text of the image
                 - source_url: Source webpage URL where the image originates
         """
-        extracted_images_data = []
+        google_images_url = f"https://www.google.com/search?q={quote(search_query)}&tbm=isch"
+        pool = pool or self.pool
+        extracted_by_position: Dict[int, Dict[str, str]] = {}
+        
+        def has_work() -> bool:
+            return bool(pending) and len(extracted_by_position) < max_image_count
+        
+        async def click_thumbnails(page, thumbnails: List[tuple]):
+            while has_work():
+                position, alt_text = pending.popleft()
+                image_data = await self._extract_preview_image(page, thumbnails, position, alt_text)
+                if image_data:
+                    extracted_by_position[position] = image_data
+        
+        async def extra_worker():
+            async with pool.acquire() as page:
+                # Other searches may hold the pool's pages; skip the page load if the work is already done
+                if has_work():
+                    await click_thumbnails(page, await self._load_thumbnails(page, google_images_url))
         
         try:
-            await self._initialize_browser()
+            async with pool.acquire() as page:
+                thumbnails = await self._load_thumbnails(page, google_images_url)
+                # Filter to get actual image thumbnails (not UI elements); skip the first one (often a UI element)
+                pending = deque(
+                    (position, alt_text) for position, (_, alt_text) in enumerate(thumbnails)
+                    if alt_text and len(alt_text) > 3
+                )
+                logger.info(f"Found {len(pending)} valid image thumbnails")
+                if pending:
+                    pending.popleft()
+                
+                # This page works through the queue too; extra pages load the results once each
+                worker_count = min(THUMBNAIL_WORKERS, pool.max_concurrent, len(pending), max_image_count)
+                await asyncio.gather(click_thumbnails(page, thumbnails), *[extra_worker() for _ in range(worker_count - 1)])
             
-            # Navigate to Google Images
-            google_images_url = f"https://www.google.com/search?q={quote(search_query)}&tbm=isch"
-            logger.info(f"Navigating to: {google_images_url}")
-            await self.page.goto(google_images_url, wait_until="domcontentloaded", timeout=self.default_timeout_ms)
+            extracted_images_data = [extracted_by_position[position] for position in sorted(extracted_by_position)][:max_image_count]
+            logger.info(f"Successfully extracted {len(extracted_images_data)} images via browser")
             
-            # Wait for images to load
-            await asyncio.sleep(2)
+        except Exception as e:
+            logger.error(f"Error during browser image extraction: {e}")
+            raise  # Re-raise to trigger fallback
+        
+        return extracted_images_data
+    
+    async def _load_thumbnails(self, page, google_images_url: str) -> List[tuple]:
+        """
+        Open the Google Images results in ``page`` and return ``(element, alt_text)`` for every
+        image element, in page order.
+        """
+        logger.info(f"Navigating to: {google_images_url}")
+        await page.goto(google_images_url, wait_until="domcontentloaded", timeout=self.default_timeout_ms)
+        
+        # Wait for images to load
+        await asyncio.sleep(2)
+        
+        # Get all image thumbnails
+        all_image_elements = await page.query_selector_all(_THUMBNAIL_SELECTOR)
+        logger.info(f"Found {len(all_image_elements)} image elements")
+        return [(element, await element.get_attribute('alt')) for element in all_image_elements]
+    
+    async def _extract_preview_image(self, page, thumbnails: List[tuple], position: int, alt_text: str) -> Optional[Dict[str, str]]:
+        """
+        Click the thumbnail found at ``position`` on the first results page and read the preview image.
+        
+        ``thumbnails`` is this page's ``_load_thumbnails`` result. The element at the same position
+        is used only if its alt text matches; otherwise the first element with that alt text is,
+        so a reloaded page with a different layout never gets the wrong image clicked.
+        Returns None when the thumbnail is missing, cannot be clicked or has no usable preview.
+        """
+        if position < len(thumbnails) and thumbnails[position][1] == alt_text:
+            thumbnail_element = thumbnails[position][0]
+        else:
+            thumbnail_element = next((element for element, alt in thumbnails if alt == alt_text), None)
+            if thumbnail_element is None:
+                logger.warning(f"Thumbnail {position + 1} not found on this page: {alt_text[:50]}")
+                return None
+        
+        try:
+            logger.info(f"Clicking thumbnail {position + 1}: {alt_text[:50]}...")
             
-            # Get all image thumbnails
-            all_image_elements = await self.page.query_selector_all('img[src], img[data-src]')
-            logger.info(f"Found {len(all_image_elements)} image elements")
+            # Scroll thumbnail into view
+            await thumbnail_element.scroll_into_view_if_needed()
+            await asyncio.sleep(0.3)
             
-            # Filter to get actual image thumbnails (not UI elements)
-            valid_image_thumbnails = []
-            for thumbnail_element in all_image_elements:
-                alt_text = await thumbnail_element.get_attribute('alt')
-                if alt_text and len(alt_text) > 3:  # Has meaningful alt text
-                    valid_image_thumbnails.append(thumbnail_element)
+            # Click the thumbnail
+            await thumbnail_element.click(timeout=5000)
             
-            logger.info(f"Found {len(valid_image_thumbnails)} valid image thumbnails")
+            # Wait for preview to load
+            await asyncio.sleep(2)
             
-            # Click on each thumbnail and extract the preview image
-            successfully_extracted_count = 0
-            for thumbnail_index, thumbnail_element in enumerate(valid_image_thumbnails):
-                # Skip first thumbnail (often a UI element)
-                if thumbnail_index == 0:
-                    continue
-                    
-                if successfully_extracted_count >= max_image_count:
-                    break
-                
-                try:
-                    # Get thumbnail info before clicking
-                    thumbnail_alt_text = await thumbnail_element.get_attribute('alt')
-                    
-                    # Skip if no alt text or if it's a UI element
-                    if not thumbnail_alt_text or len(thumbnail_alt_text) < 3:
-                        continue
-                    
-                    logger.info(f"Clicking thumbnail {thumbnail_index + 1}: {thumbnail_alt_text[:50]}...")
-                    
-                    # Scroll thumbnail into view
-                    await thumbnail_element.scroll_into_view_if_needed()
-                    await asyncio.sleep(0.3)
-                    
-                    # Click the thumbnail
-                    await thumbnail_element.click(timeout=5000)
-                    
-                    # Wait for preview to load
-                    await asyncio.sleep(2)
-                    
-                    # Extract the high-quality image URL from preview using JavaScript
-                    preview_image_data = await self.page.evaluate("""
-                        () => {
-                            const imgs = document.querySelectorAll('img');
-                            let bestImg = null;
-                            let maxSize = 0;
-                            
-                            for (const img of imgs) {
-                                if (img.src && img.src.startsWith('http') && 
-                                    img.naturalWidth * img.naturalHeight > maxSize) {
-                                    
-                                    // Check if it's in a dialog or preview container
-                                    const inDialog = img.closest('[role="dialog"]') || 
-                                                   img.closest('div[jsaction]');
-                                    
-                                    if (inDialog && img.naturalWidth > 200 && img.naturalHeight > 200) {
-                                        maxSize = img.naturalWidth * img.naturalHeight;
-                                        bestImg = img;
-                                    }
-                                }
-                            }
-                            
-                            if (bestImg) {
-                                // Try to find source URL
-                                let sourceUrl = '';
-                                const linkElement = bestImg.closest('a');
-                                if (linkElement) {
-                                    sourceUrl = linkElement.href || '';
-                                }
-                                
-                                return {
-                                    image_url: bestImg.src,
-                                    image_title: bestImg.alt || 'No title',
-                                    source_url: sourceUrl,
-                                    width: bestImg.naturalWidth,
-                                    height: bestImg.naturalHeight
-                                };
-                            }
-                            return null;
-                        }
-                    """)
-                    
-                    if preview_image_data and preview_image_data.get('image_url'):
-                        logger.info(f"Extracted image: {preview_image_data['image_url'][:80]}...")
-                        logger.info(f"  Size: {preview_image_data.get('width')}x{preview_image_data.get('height')}")
-                        extracted_images_data.append({
-                            'image_url': preview_image_data['image_url'],
-                            'image_title': preview_image_data.get('image_title', 'No title'),
-                            'source_url': preview_image_data.get('source_url', ''),
-                        })
-                        successfully_extracted_count += 1
-                    else:
-                        logger.warning(f"Could not extract image data for thumbnail {thumbnail_index + 1}")
-                    
-                    # Close preview by pressing Escape
-                    await self.page.keyboard.press('Escape')
-                    await asyncio.sleep(0.5)
-                    
-                except PlaywrightTimeoutError:
-                    logger.warning(f"Timeout clicking thumbnail {thumbnail_index + 1}")
-                    continue
-                except Exception as e:
-                    logger.warning(f"Error processing thumbnail {thumbnail_index + 1}: {e}")
-                    continue
+            # Extract the high-quality image URL from preview using JavaScript
+            preview_image_data = await page.evaluate(_PREVIEW_IMAGE_JS)
             
-            logger.info(f"Successfully extracted {len(extracted_images_data)} images via browser")
+            # Close preview by pressing Escape, so the next thumbnail on this page starts clean
+            await page.keyboard.press('Escape')
+            await asyncio.sleep(0.5)
             
+        except PlaywrightTimeoutError:
+            logger.warning(f"Timeout clicking thumbnail {position + 1}")
+            return None
         except Exception as e:
-            logger.error(f"Error during browser image extraction: {e}")
-            raise  # Re-raise to trigger fallback
-        finally:
-            await self._terminate_browser()
+            logger.warning(f"Error processing thumbnail {position + 1}: {e}")
+            return None
         
-        return extracted_images_data
+        if not (preview_image_data and preview_image_data.get('image_url')):
+            logger.warning(f"Could not extract image data for thumbnail {position + 1}")
+            return None
+        
+        logger.info(f"Extracted image: {preview_image_data['image_url'][:80]}...")
+        logger.info(f"  Size: {preview_image_data.get('width')}x{preview_image_data.get('height')}")
+        return {
+            'image_url': preview_image_data['image_url'],
+            'image_title': preview_image_data.get('image_title', 'No title'),
+            'source_url': preview_image_data.get('source_url', ''),
+        }
     
     def _extract_images_with_browser_sync(
         self, 
@@ -279,7 +571,7 @@ class ContentImageFetcher:
         """
         Synchronous wrapper for browser-based image extraction.
         
-        Handles event loop management to work in both sync and async contexts.
+        Runs on the browser pool's event loop, so it works in both sync and async contexts.
         
         Args:
             search_query: The search query for Google Images
@@ -288,25 +580,9 @@ class ContentImageFetcher:
         Returns:
             List of dictionaries with image data (image_url, image_title, source_url)
         """
-        try:
-            # Check if there's already a running event loop
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # We're in an async context (e.g., FastAPI)
-                # Create a new event loop in a thread
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(
-                        asyncio.run, 
-                        self._extract_high_quality_images_async(search_query, max_image_count)
-                    )
-                    return future.result()
-            else:
-                # We're in a sync context, use asyncio.run normally
-                return asyncio.run(self._extract_high_quality_images_async(search_query, max_image_count))
-        except RuntimeError:
-            # No event loop exists, create one
-            return asyncio.run(self._extract_high_quality_images_async(search_query, max_image_count))
+        # The pool is picked here, so a headless change made after construction takes effect
+        pool = self.pool
+        return pool.run(self._extract_high_quality_images_async(search_query, max_image_count, pool))
     
     def download_image_as_base64(self, image_url: str, request_timeout_seconds: int = 10) -> Optional[str]:
         """
@@ -320,33 +596,102 @@ class ContentImageFetcher:
             Base64 encoded data URI string (e.g., 'data:image/jpeg;base64,...'), or None if download failed
         """
         try:
-            response = requests.get(image_url, timeout=request_timeout_seconds, stream=True)
-            response.raise_for_status()
-            
-            # Read image content
-            image_binary_content = response.content
-            
-            # Convert to base64
-            base64_encoded_string = base64.b64encode(image_binary_content).decode('utf-8')
-            
-            # Get content type for data URI
-            content_type = response.headers.get('Content-Type', 'image/jpeg')
-            
-            # Return as data URI format
-            return f"data:{content_type};base64,{base64_encoded_string}"
+            return _download_b64(image_url, request_timeout_seconds)
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching image from {image_url}: {e}")
             return None
+        except ValueError as e:
+            # Not an image (e.g. an HTML page); the body was never downloaded
+            logger.warning(str(e))
+            return None
         except Exception as e:
             logger.error(f"Error encoding image: {e}")
             return None
+    
+    @classmethod
+    def clear_cache(cls):
+        """Drop all cached image downloads and search result pages."""
+        global _image_cache_bytes
+        with _image_cache_lock:
+            _image_cache.clear()
+            _image_cache_bytes = 0
+        with _search_page_cache_lock:
+            _search_page_cache.clear()
+    
+    async def adownload_images_as_base64(self, image_urls: List[str], request_timeout_seconds: int = 10) -> List[Optional[str]]:
+        """
+        Download several images concurrently and convert them to base64 data URIs.
+        
+        Each distinct URL is fetched once, and images already in the download cache are
+        not fetched at all. The rest use the shared, long-lived aiohttp session when aiohttp
+        is installed, otherwise download_image_as_base64 runs on the shared download thread pool.
+        
+        Args:
+            image_urls: The URLs of the images to download
+            request_timeout_seconds: Maximum time to wait for each download in seconds
+            
+        Returns:
+            Data URIs in the same order as image_urls, None for each download that failed
+        """
+        if not image_urls:
+            return []
+        downloaded = {image_url: _cached_image(image_url) for image_url in image_urls}
+        missing = [image_url for image_url, data_uri in downloaded.items() if data_uri is None]
+        if not missing:
+            return [downloaded[image_url] for image_url in image_urls]
+        
+        if aiohttp is None:
+            loop = asyncio.get_running_loop()
+            pool = _get_download_pool()
+            downloads = await asyncio.gather(
+                *(loop.run_in_executor(pool, self.download_image_as_base64, image_url, request_timeout_seconds) for image_url in missing)
+            )
+        else:
+            download_loop = _get_download_loop()
+            fetch = _fetch_images_aiohttp(missing, request_timeout_seconds)
+            if asyncio.get_running_loop() is download_loop:
+                downloads = await fetch
+            else:
+                downloads = await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(fetch, download_loop))
+            for image_url, data_uri in zip(missing, downloads):
+                if data_uri is not None:
+                    _cache_image(image_url, data_uri)
+        downloaded.update(zip(missing, downloads))
+        return [downloaded[image_url] for image_url in image_urls]
+    
+    def download_images_as_base64(self, image_urls: List[str], request_timeout_seconds: int = 10) -> List[Optional[str]]:
+        """
+        Synchronous adownload_images_as_base64; works in both sync and async contexts.
+        
+        Without aiohttp the downloads go straight to the shared thread pool, with no event loop.
+        
+        Args:
+            image_urls: The URLs of the images to download
+            request_timeout_seconds: Maximum time to wait for each download in seconds
+            
+        Returns:
+            Data URIs in the same order as image_urls, None for each download that failed
+        """
+        if not image_urls:
+            return []
+        if aiohttp is None:
+            unique_urls = list(dict.fromkeys(image_urls))
+            downloads = _get_download_pool().map(
+                lambda image_url: self.download_image_as_base64(image_url, request_timeout_seconds), unique_urls
+            )
+            downloaded = dict(zip(unique_urls, downloads))
+            return [downloaded[image_url] for image_url in image_urls]
+        return asyncio.run_coroutine_threadsafe(
+            self.adownload_images_as_base64(image_urls, request_timeout_seconds), _get_download_loop()
+        ).result()
   
     def extract_images_from_google_page_source(
         self, 
         search_query: str, 
         max_image_count: int = 10, 
-        page_start_percentage: float = 30.0
+        page_start_percentage: float = 30.0,
+        convert_to_base64: bool = True
     ) -> List[Dict]:
         """
         Fetch Google Images page source and extract image data with metadata.
@@ -358,6 +703,8 @@ class ContentImageFetcher:
             search_query: The search query for Google Images
             max_image_count: Maximum number of images to extract
             page_start_percentage: Percentage of page to skip before parsing (to avoid UI elements)
+            convert_to_base64: Whether to download URL images and convert them to base64
+                (images Google already inlines as data: URIs are always kept as base64)
         
         Returns:
             List of dictionaries containing:
@@ -369,81 +716,62 @@ class ContentImageFetcher:
         try:
             search_url = f"https://www.google.com/search?q={quote(search_query)}&tbm=isch"
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
             logger.info(f"Fetching page source from: {search_url}")
-            response = requests.get(search_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            page_html_content = response.text
+            page_html_content = _fetch_search_page(search_url, request_timeout_seconds=10)
             logger.info(f"Page source fetched. Total length: {len(page_html_content)} characters")
             
             # Calculate start position to skip header/UI elements
             start_position = int(len(page_html_content) * (page_start_percentage / 100.0))
             page_section_to_parse = page_html_content[start_position:]
             
-            soup = BeautifulSoup(page_section_to_parse, 'html.parser')
-            
             extracted_images_data = []
+            # Image sources already taken; the same thumbnail often appears under several anchors
             seen_image_urls = set()
+            # Metadata entries whose image is a URL, downloaded together once collection is done
+            pending_downloads = []
             
-            # Find all anchor tags containing images
-            for anchor_tag in soup.find_all('a', href=True):
-                href_value = anchor_tag.get('href', '')
-                
-                # Skip internal search links
-                if href_value.startswith('/search?'):
+            # Find all images inside result anchors
+            for href_value, image_src, image_alt_text in _iter_google_result_images(page_section_to_parse):
+                if image_src in seen_image_urls:
                     continue
+                seen_image_urls.add(image_src)
+                if image_alt_text is None:
+                    image_alt_text = 'No title available'
                 
-                # Find img tags within this anchor
-                image_tags = anchor_tag.find_all('img', src=True)
+                image_metadata = {
+                    'image_title': image_alt_text,
+                    'source_url': href_value,
+                    'is_base64': False,
+                    'image_data': None
+                }
                 
-                for image_tag in image_tags:
-                    image_src = image_tag.get('src', '')
-                    image_alt_text = image_tag.get('alt', 'No title available')
-                    
-                    # Create unique key to avoid duplicates
-                    unique_identifier = f"{href_value}_{image_src[:50]}"
-                    
-                    if unique_identifier not in seen_image_urls:
-                        seen_image_urls.add(unique_identifier)
-                        
-                        image_metadata = {
-                            'image_title': image_alt_text,
-                            'source_url': href_value,
-                            'is_base64': False,
-                            'image_data': None
-                        }
-                        
-                        # Check if image src is already base64 encoded
-                        if image_src.startswith('data:'):
-                            image_metadata['image_data'] = image_src
-                            image_metadata['is_base64'] = True
-                            logger.info(f"Found base64 image with title: {image_alt_text[:50]}...")
-                        else:
-                            # It's a URL, try to convert to base64
-                            base64_image_data = self.download_image_as_base64(image_src)
-                            if base64_image_data:
-                                image_metadata['image_data'] = base64_image_data
-                                image_metadata['is_base64'] = True
-                                logger.info(f"Converted URL to base64 for: {image_alt_text[:50]}...")
-                            else:
-                                # Keep as URL if conversion fails
-                                image_metadata['image_data'] = image_src
-                                image_metadata['is_base64'] = False
-                                logger.warning(f"Failed to convert, keeping URL for: {image_alt_text[:50]}...")
-                        
-                        extracted_images_data.append(image_metadata)
-                        
-                        # Stop if we've reached max_image_count
-                        if len(extracted_images_data) >= max_image_count:
-                            break
+                # Check if image src is already base64 encoded
+                if image_src.startswith('data:'):
+                    image_metadata['image_data'] = image_src
+                    image_metadata['is_base64'] = True
+                    logger.info(f"Found base64 image with title: {image_alt_text[:50]}...")
+                else:
+                    # It's a URL; keep it, and try to convert it to base64 below if requested
+                    image_metadata['image_data'] = image_src
+                    if convert_to_base64:
+                        pending_downloads.append(image_metadata)
                 
+                extracted_images_data.append(image_metadata)
+                
+                # Stop if we've reached max_image_count
                 if len(extracted_images_data) >= max_image_count:
                     break
             
+            base64_images = self.download_images_as_base64([image_metadata['image_data'] for image_metadata in pending_downloads])
+            for image_metadata, base64_image_data in zip(pending_downloads, base64_images):
+                if base64_image_data:
+                    image_metadata['image_data'] = base64_image_data
+                    image_metadata['is_base64'] = True
+                    logger.info(f"Converted URL to base64 for: {image_metadata['image_title'][:50]}...")
+                else:
+                    # Keep as URL if conversion fails
+                    logger.warning(f"Failed to convert, keeping URL for: {image_metadata['image_title'][:50]}...")
+            
             logger.info(f"Extracted {len(extracted_images_data)} images from page source")
             return extracted_images_data
             
@@ -457,7 +785,8 @@ class ContentImageFetcher:
     def extract_images_from_bing_page_source(
         self,
         search_query: str,
-        max_image_count: int = 10
+        max_image_count: int = 10,
+        convert_to_base64: bool = True
     ) -> List[Dict]:
         """
         Fetch Bing Images page source and extract high-quality image URLs with metadata.
@@ -468,6 +797,7 @@ class ContentImageFetcher:
         Args:
             search_query: The search query for Bing Images
             max_image_count: Maximum number of images to extract
+            convert_to_base64: Whether to download the images and convert them to base64
         
         Returns:
             List of dictionaries containing:
@@ -479,18 +809,11 @@ class ContentImageFetcher:
         try:
             search_url = f"https://www.bing.com/images/search?q={quote(search_query)}"
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
             logger.info(f"Fetching Bing page source from: {search_url}")
-            response = requests.get(search_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            page_html_content = response.text
+            page_html_content = _fetch_search_page(search_url, request_timeout_seconds=10)
             logger.info(f"Bing page source fetched. Total length: {len(page_html_content)} characters")
             
-            soup = BeautifulSoup(page_html_content, 'html.parser')
+            soup = BeautifulSoup(page_html_content, HTML_PARSER, parse_only=SoupStrainer('a'))
             
             # Find all image links with metadata
             image_links = soup.find_all('a', class_='iusc')
@@ -506,7 +829,7 @@ class ContentImageFetcher:
                         continue
                     
                     # Parse JSON data
-                    metadata = json.loads(m_attribute)
+                    metadata = json_loads(m_attribute)
                     
                     # Extract high-quality image URL
                     image_url = metadata.get('murl')  # Media URL (full resolution)
@@ -526,27 +849,29 @@ class ContentImageFetcher:
                         'image_data': image_url
                     }
                     
-                    # Try to convert to base64
-                    base64_image_data = self.download_image_as_base64(image_url)
-                    if base64_image_data:
-                        image_metadata['image_data'] = base64_image_data
-                        image_metadata['is_base64'] = True
-                        logger.info(f"  Converted to base64")
-                    else:
-                        logger.warning(f"  Failed to convert, keeping URL")
-                    
                     extracted_images_data.append(image_metadata)
                     
                     if len(extracted_images_data) >= max_image_count:
                         break
                         
-                except json.JSONDecodeError as e:
+                except JSONDecodeError as e:
                     logger.warning(f"Failed to parse image metadata JSON: {e}")
                     continue
                 except Exception as e:
                     logger.warning(f"Error processing Bing image: {e}")
                     continue
             
+            # Try to convert all collected images to base64 at once
+            to_convert = extracted_images_data if convert_to_base64 else []
+            base64_images = self.download_images_as_base64([image_metadata['image_data'] for image_metadata in to_convert])
+            for image_metadata, base64_image_data in zip(to_convert, base64_images):
+                if base64_image_data:
+                    image_metadata['image_data'] = base64_image_data
+                    image_metadata['is_base64'] = True
+                    logger.info(f"Converted Bing image to base64: {image_metadata['image_title'][:50]}...")
+                else:
+                    logger.warning(f"Failed to convert, keeping URL: {image_metadata['image_title'][:50]}...")
+            
             logger.info(f"Extracted {len(extracted_images_data)} images from Bing page source")
             return extracted_images_data
             
@@ -583,7 +908,8 @@ class ContentImageFetcher:
                 prompt=search_query,
                 system_instruction=self.gemini_system_prompt
             )
-            gemini_response_json = json.loads(gemini_response_text.replace("```json", "").replace("```", ""))
+            fence_match = _CODE_FENCE_RE.search(gemini_response_text)
+            gemini_response_json = json_loads(fence_match.group(1) if fence_match else gemini_response_text)
             logger.info(f"Gemini response: {gemini_response_json}")
             
             # Initialize Gemini result
@@ -598,8 +924,8 @@ class ContentImageFetcher:
                 gemini_result["images_base64"] = []
                 gemini_result["failed_images"] = []
                 
-                for image_url in gemini_result["images_links"]:
-                    base64_image_data = self.download_image_as_base64(image_url)
+                base64_images = self.download_images_as_base64(gemini_result["images_links"])
+                for image_url, base64_image_data in zip(gemini_result["images_links"], base64_images):
                     if base64_image_data:
                         gemini_result["images_base64"].append(base64_image_data)
                     else:
@@ -668,29 +994,25 @@ class ContentImageFetcher:
             )
             
             if browser_images:
-                # Convert to base64 if requested
                 for img_info in browser_images:
-                    image_url = img_info.get('image_url', '')
-                    image_title = img_info.get('image_title', 'No title')
-                    source_url = img_info.get('source_url', '')
-                    
-                    image_metadata = {
-                        'image_title': image_title,
-                        'source_url': source_url,
+                    images_data.append({
+                        'image_title': img_info.get('image_title', 'No title'),
+                        'source_url': img_info.get('source_url', ''),
                         'is_base64': False,
-                        'image_data': image_url
-                    }
-                    
-                    if convert_to_base64 and image_url:
-                        base64_image_data = self.download_image_as_base64(image_url)
+                        'image_data': img_info.get('image_url', '')
+                    })
+                
+                # Convert to base64 if requested, downloading all images concurrently
+                if convert_to_base64:
+                    to_convert = [image_metadata for image_metadata in images_data if image_metadata['image_data']]
+                    base64_images = self.download_images_as_base64([image_metadata['image_data'] for image_metadata in to_convert])
+                    for image_metadata, base64_image_data in zip(to_convert, base64_images):
                         if base64_image_data:
                             image_metadata['image_data'] = base64_image_data
                             image_metadata['is_base64'] = True
-                            logger.info(f"Converted Google image to base64: {image_title[:50]}...")
+                            logger.info(f"Converted Google image to base64: {image_metadata['image_title'][:50]}...")
                         else:
-                            logger.warning(f"Failed to convert to base64, keeping URL: {image_title[:50]}...")
-                    
-                    images_data.append(image_metadata)
+                            logger.warning(f"Failed to convert to base64, keeping URL: {image_metadata['image_title'][:50]}...")
                 
                 extraction_method = 'google_browser'
                 logger.info(f"Google browser extraction successful: {len(images_data)} images")
@@ -705,7 +1027,8 @@ class ContentImageFetcher:
                 logger.info("Falling back to Bing Images HTTP extraction (no Playwright)...")
                 bing_images = self.extract_images_from_bing_page_source(
                     search_query=search_query,
-                    max_image_count=max_images_per_source
+                    max_image_count=max_images_per_source,
+                    convert_to_base64=convert_to_base64
                 )
                 
                 if bing_images:
@@ -724,7 +1047,8 @@ class ContentImageFetcher:
                 images_data = self.extract_images_from_google_page_source(
                     search_query_with_hint, 
                     max_image_count=max_images_per_source,
-                    page_start_percentage=30.0
+                    page_start_percentage=30.0,
+                    convert_to_base64=convert_to_base64
                 )
                 extraction_method = 'google_page_source'
                 logger.info(f"Google page source extraction completed: {len(images_data)} images")
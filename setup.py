@@ -27,6 +27,16 @@ setup(
     ],
     python_requires=">=3.12",
     install_requires=core_requirements,
+    extras_require={
+        # Optional speedups, kept in sync with [project.optional-dependencies] in pyproject.toml
+        "fast": [
+            "orjson>=3.9",
+            "aiohttp>=3.9",
+            "lxml>=5.0",
+            "selectolax>=0.3.21",
+            "pybase64>=1.3",
+        ],
+    },
     entry_points={
         "console_scripts": [
             "forgeoagent=forgeoagent.cli:main",
@@ -34,6 +44,6 @@ setup(
     },
     include_package_data=True,
     package_data={
-        "forgeoagent": ["web/templates/*", "web/static/*"],
+        "forgeoagent": ["web/templates/*", "web/static/*", "config/prompts/*.md"],
     },
 )
\ No newline at end of file
@@ -0,0 +1,71 @@
+import unittest
+from unittest import mock
+
+from forgeoagent.core.managers.api_key_manager import GlobalAPIKeyManager, _TokenBucket
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_starts_full_and_refills_over_time(self):
+        bucket = _TokenBucket(rate=1.0, capacity=2.0)
+        bucket.updated = 100.0
+        self.assertEqual(bucket.available(100.0), 2.0)
+        self.assertEqual(bucket.take(100.0), 0.0)
+        self.assertEqual(bucket.available(100.0), 1.0)
+        self.assertEqual(bucket.available(100.5), 1.5)
+        self.assertEqual(bucket.available(200.0), 2.0)  # never above capacity
+
+    def test_take_past_empty_returns_wait(self):
+        bucket = _TokenBucket(rate=2.0, capacity=1.0)
+        bucket.updated = 0.0
+        self.assertEqual(bucket.take(0.0), 0.0)
+        self.assertAlmostEqual(bucket.take(0.0), 0.5)
+        self.assertAlmostEqual(bucket.take(0.0), 1.0)  # queued callers wait in turn
+
+
+class ReserveKeyTest(unittest.TestCase):
+    def setUp(self):
+        self._saved = (GlobalAPIKeyManager._rpm, GlobalAPIKeyManager._buckets, GlobalAPIKeyManager._cooldowns)
+        GlobalAPIKeyManager._buckets = {}
+        GlobalAPIKeyManager._cooldowns = {}
+
+    def tearDown(self):
+        GlobalAPIKeyManager._rpm, GlobalAPIKeyManager._buckets, GlobalAPIKeyManager._cooldowns = self._saved
+
+    def test_without_limit_uses_first_key(self):
+        GlobalAPIKeyManager._rpm = 0
+        self.assertEqual(GlobalAPIKeyManager.reserve_key(["a", "b"]), ("a", 0.0))
+
+    def test_spreads_requests_over_keys_with_tokens_left(self):
+        GlobalAPIKeyManager._rpm = 60.0  # one token per second, bucket of 60
+        with mock.patch("forgeoagent.core.managers.api_key_manager.time.monotonic", return_value=1000.0):
+            first, _ = GlobalAPIKeyManager.reserve_key(["a", "b"])
+            second, wait = GlobalAPIKeyManager.reserve_key(["a", "b"])
+        self.assertNotEqual(first, second)
+        self.assertEqual(wait, 0.0)
+
+    def test_waits_when_every_bucket_is_empty(self):
+        GlobalAPIKeyManager._rpm = 1.0  # one request per minute
+        with mock.patch("forgeoagent.core.managers.api_key_manager.time.monotonic", return_value=1000.0):
+            self.assertEqual(GlobalAPIKeyManager.reserve_key(["a"]), ("a", 0.0))
+            key, wait = GlobalAPIKeyManager.reserve_key(["a"])
+        self.assertEqual(key, "a")
+        self.assertAlmostEqual(wait, 60.0)
+
+    def test_cooling_down_key_is_skipped(self):
+        GlobalAPIKeyManager._rpm = 0
+        with mock.patch("forgeoagent.core.managers.api_key_manager.time.monotonic", return_value=1000.0):
+            GlobalAPIKeyManager.defer_key("a", 30.0)
+            self.assertEqual(GlobalAPIKeyManager.reserve_key(["a", "b"]), ("b", 0.0))
+            key, wait = GlobalAPIKeyManager.reserve_key(["a"])
+        self.assertEqual((key, wait), ("a", 30.0))
+
+    def test_expired_cooldowns_are_dropped(self):
+        GlobalAPIKeyManager._rpm = 0
+        GlobalAPIKeyManager._cooldowns = {"a": 5.0}
+        with mock.patch("forgeoagent.core.managers.api_key_manager.time.monotonic", return_value=10.0):
+            self.assertEqual(GlobalAPIKeyManager.reserve_key(["a", "b"]), ("a", 0.0))
+        self.assertEqual(GlobalAPIKeyManager._cooldowns, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from forgeoagent.clients.batch_runner import _topological_order
+
+
+def _tasks(**depends_on):
+    return {task_id: {"id": task_id, "prompt": task_id, "depends_on": deps} for task_id, deps in depends_on.items()}
+
+
+class TopologicalOrderTest(unittest.TestCase):
+    def test_dependencies_come_first(self):
+        by_id = _tasks(c=["a", "b"], a=[], b=["a"])
+        order, errors = _topological_order(list(by_id), by_id)
+        self.assertEqual(errors, {})
+        self.assertEqual(sorted(order), ["a", "b", "c"])
+        self.assertLess(order.index("a"), order.index("b"))
+        self.assertLess(order.index("b"), order.index("c"))
+
+    def test_independent_tasks_keep_input_order(self):
+        by_id = _tasks(x=[], y=[], z=[])
+        self.assertEqual(_topological_order(list(by_id), by_id), (["x", "y", "z"], {}))
+
+    def test_unknown_dependency_is_reported(self):
+        by_id = _tasks(a=["missing"], b=[])
+        order, errors = _topological_order(list(by_id), by_id)
+        self.assertEqual(sorted(order), ["a", "b"])
+        self.assertIn("missing", errors["a"])
+        self.assertNotIn("b", errors)
+
+    def test_cycle_is_reported_for_every_member(self):
+        by_id = _tasks(a=["b"], b=["a"], c=[], d=["a"])
+        order, errors = _topological_order(list(by_id), by_id)
+        self.assertEqual(sorted(order), ["a", "b", "c", "d"])
+        self.assertEqual(errors["a"], "Circular dependency")
+        self.assertEqual(errors["b"], "Circular dependency")
+        self.assertIn("d", errors)  # waits on the cycle, so it can never start
+        self.assertNotIn("c", errors)
+
+    def test_self_dependency_is_a_cycle(self):
+        by_id = _tasks(a=["a"])
+        self.assertEqual(_topological_order(["a"], by_id), (["a"], {"a": "Circular dependency"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
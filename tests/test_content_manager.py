@@ -0,0 +1,91 @@
+import unittest
+
+from google.genai import types
+
+from forgeoagent.clients.gemini.gemini_content_manager import GeminiContentManager
+
+
+def _msg(role: str, text: str) -> types.Content:
+    return types.Content(role=role, parts=[types.Part.from_text(text=text)])
+
+
+def _turns(count: int) -> list:
+    contents = []
+    for index in range(count):
+        contents += [_msg("user", f"u{index}"), _msg("model", f"m{index}")]
+    return contents
+
+
+def _texts(contents: list) -> list:
+    return [content.parts[0].text for content in contents]
+
+
+class _Manager(GeminiContentManager):
+    def __init__(self, max_history_turns=None, summarize_history=False, summary="summary"):
+        self.max_history_turns = max_history_turns
+        self.summarize_history = summarize_history
+        self.summary = summary
+        self.summarized_heads = []
+
+    def _get_history_summary(self, head):
+        self.summarized_heads.append(len(head))
+        return self.summary
+
+
+class WindowHistoryTest(unittest.TestCase):
+    def test_without_limit_everything_is_sent(self):
+        contents = _turns(5)
+        self.assertEqual(_Manager()._window_history(contents), contents)
+
+    def test_keeps_last_turns(self):
+        windowed = _Manager(max_history_turns=2)._window_history(_turns(5))
+        self.assertEqual(_texts(windowed), ["u3", "m3", "u4", "m4"])
+
+    def test_summary_replaces_whole_windows(self):
+        manager = _Manager(max_history_turns=2, summarize_history=True)
+        windowed = manager._window_history(_turns(7))  # 14 messages, window of 4
+        self.assertEqual(manager.summarized_heads, [8])
+        self.assertIn("summary", windowed[0].parts[0].text)
+        self.assertEqual(_texts(windowed[1:]), ["u4", "m4", "u5", "m5", "u6", "m6"])
+
+    def test_no_summary_yet_sends_everything(self):
+        manager = _Manager(max_history_turns=2, summarize_history=True)
+        self.assertEqual(len(manager._window_history(_turns(3))), 6)
+        self.assertEqual(manager.summarized_heads, [])
+
+    def test_failed_summary_falls_back_to_window(self):
+        manager = _Manager(max_history_turns=2, summarize_history=True, summary=None)
+        self.assertEqual(_texts(manager._window_history(_turns(7))), ["u5", "m5", "u6", "m6"])
+
+
+class RecordTurnTest(unittest.TestCase):
+    def test_records_user_and_model_pair(self):
+        history = []
+        _Manager()._record_turn(history, _msg("user", "q"), "a")
+        self.assertEqual([(c.role, c.parts[0].text) for c in history], [("user", "q"), ("model", "a")])
+
+    def test_turn_without_model_text_is_skipped(self):
+        history = []
+        _Manager()._record_turn(history, _msg("user", "q"), "")
+        _Manager()._record_turn(history, _msg("user", "q"), None)
+        self.assertEqual(history, [])
+
+    def test_trims_history_beyond_two_windows(self):
+        manager = _Manager(max_history_turns=2)
+        history = []
+        for index in range(20):
+            manager._record_turn(history, _msg("user", f"u{index}"), f"m{index}")
+            self.assertLessEqual(len(history), 8)
+        self.assertEqual(_texts(history)[-2:], ["u19", "m19"])
+        self.assertEqual([c.role for c in history], ["user", "model"] * (len(history) // 2))
+
+    def test_no_trimming_when_summarizing(self):
+        manager = _Manager(max_history_turns=2, summarize_history=True)
+        history = []
+        for index in range(10):
+            manager._record_turn(history, _msg("user", f"u{index}"), f"m{index}")
+        self.assertEqual(len(history), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import base64
+import os
+import unittest
+
+from forgeoagent.web.services.content_fetcher import _DataURIEncoder
+
+
+def _encode(chunks, content_type="image/png") -> str:
+    encoder = _DataURIEncoder(content_type)
+    for chunk in chunks:
+        encoder.feed(chunk)
+    return encoder.finish()
+
+
+class DataURIEncoderTest(unittest.TestCase):
+    def setUp(self):
+        self.body = os.urandom(1000)
+        self.expected = "data:image/png;base64," + base64.b64encode(self.body).decode("ascii")
+
+    def test_single_chunk(self):
+        self.assertEqual(_encode([self.body]), self.expected)
+
+    def test_any_chunk_split_gives_the_same_result(self):
+        for size in (1, 2, 3, 4, 5, 7, 64, 999):
+            chunks = [self.body[start:start + size] for start in range(0, len(self.body), size)]
+            self.assertEqual(_encode(chunks), self.expected, size)
+
+    def test_empty_chunks_are_ignored(self):
+        self.assertEqual(_encode([b"", self.body[:500], b"", self.body[500:], b""]), self.expected)
+
+    def test_empty_body(self):
+        self.assertEqual(_encode([]), "data:image/png;base64,")
+
+    def test_missing_content_type_defaults_to_jpeg(self):
+        self.assertTrue(_encode([b"abc"], None).startswith("data:image/jpeg;base64,"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from forgeoagent.clients.gemini_engine import GeminiAPIClient
+from forgeoagent.core.managers.api_key_manager import GlobalAPIKeyManager
+
+
+def _instruction_texts(config) -> list:
+    return [part.text for part in config.system_instruction]
+
+
+class SystemInstructionTest(unittest.TestCase):
+    _STATE = ("_api_keys", "_current_index", "_failed_keys", "_usage_stats", "_last_reset_date")
+
+    def setUp(self):
+        self._saved = {name: getattr(GlobalAPIKeyManager, name) for name in self._STATE}
+        GlobalAPIKeyManager.initialize(["test-key"])
+
+    def tearDown(self):
+        for name, value in self._saved.items():
+            setattr(GlobalAPIKeyManager, name, value)
+
+    def test_reassigned_instruction_is_sent(self):
+        client = GeminiAPIClient(system_instruction="first", new_content=True, response_cache=False)
+        self.assertEqual(_instruction_texts(client._prepare_generate("hi", False, None)["config"])[-1], "first")
+
+        client.system_instruction = "second"
+        config = client._prepare_generate("hi", False, None)["config"]
+        self.assertEqual(_instruction_texts(config)[-1], "second")
+        self.assertNotIn("first", _instruction_texts(config))
+        self.assertEqual(_instruction_texts(client._search_config)[-1], "second")
+        self.assertTrue(client.system_instruction.endswith("second"))
+
+    def test_cleared_instruction_keeps_only_default(self):
+        client = GeminiAPIClient(system_instruction="first", new_content=True, response_cache=False)
+        default_key = GeminiAPIClient(new_content=True)._system_instruction_key
+        client.system_instruction = None
+        self.assertIsNone(client.system_instruction)
+        self.assertEqual(client._system_instruction_key, default_key)
+        self.assertEqual(len(client._prepare_generate("hi", False, None)["config"].system_instruction), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
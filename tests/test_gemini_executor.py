@@ -0,0 +1,39 @@
+import unittest
+
+from google.genai import types
+
+from forgeoagent.clients.gemini import gemini_executor
+from forgeoagent.clients.gemini_engine import GeminiAPIClient
+
+
+def _fresh_properties() -> dict:
+    return {"response": types.Schema(type=types.Type.STRING)}
+
+
+class GenerateConfigCacheTest(unittest.TestCase):
+    def test_equivalent_clients_share_config(self):
+        properties = _fresh_properties()
+        first = GeminiAPIClient(output_required=["response"], output_properties=properties)
+        second = GeminiAPIClient(output_required=["response"], output_properties=properties)
+        self.assertIs(first._generate_config, second._generate_config)
+        self.assertIs(first._response_schema(), second._response_schema())
+
+    def test_custom_instruction_config_is_reused_until_it_changes(self):
+        client = GeminiAPIClient(output_required=["response"], output_properties=_fresh_properties())
+        config = client._custom_generate_config("be brief")
+        self.assertIs(client._custom_generate_config("be brief"), config)
+        self.assertIsNot(client._custom_generate_config("be verbose"), config)
+
+    def test_shared_caches_stay_bounded(self):
+        limit = gemini_executor._GENERATE_CONFIG_CACHE_SIZE
+        for index in range(limit * 3):
+            client = GeminiAPIClient(output_required=["response"], output_properties=_fresh_properties())
+            client._custom_generate_config(f"instruction {index}")
+            client._response_schema_key()
+        self.assertLessEqual(len(gemini_executor._response_schemas), limit)
+        self.assertLessEqual(len(gemini_executor._schema_keys), limit)
+        self.assertLessEqual(len(gemini_executor._generate_configs), limit)
+
+
+if __name__ == "__main__":
+    unittest.main()
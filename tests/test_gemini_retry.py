@@ -0,0 +1,64 @@
+import unittest
+from unittest import mock
+
+from google.genai import errors
+
+from forgeoagent.clients.gemini.gemini_retry import (
+    KEY_ERROR,
+    RATE_LIMITED,
+    TRANSIENT,
+    BACKOFF_CAP_SECONDS,
+    classify_api_error,
+    retry_delay,
+)
+
+
+def _api_error(code: int, message: str = "error", status: str = "ERROR") -> errors.APIError:
+    error_class = errors.ClientError if code < 500 else errors.ServerError
+    return error_class(code, {"error": {"code": code, "message": message, "status": status}})
+
+
+class ClassifyApiErrorTest(unittest.TestCase):
+    def test_key_errors(self):
+        self.assertEqual(classify_api_error(_api_error(401)), KEY_ERROR)
+        self.assertEqual(classify_api_error(_api_error(403)), KEY_ERROR)
+
+    def test_rate_limit(self):
+        self.assertEqual(classify_api_error(_api_error(429, "Resource exhausted")), RATE_LIMITED)
+
+    def test_daily_quota_is_a_key_error(self):
+        error = _api_error(429, "Quota exceeded for GenerateRequestsPerDayPerProjectPerModel")
+        self.assertEqual(classify_api_error(error), KEY_ERROR)
+
+    def test_transient_server_errors(self):
+        for code in (500, 502, 503, 504):
+            self.assertEqual(classify_api_error(_api_error(code)), TRANSIENT, code)
+
+    def test_other_errors_are_not_retryable(self):
+        self.assertIsNone(classify_api_error(_api_error(400)))
+        self.assertIsNone(classify_api_error(ValueError("boom")))
+
+
+class RetryDelayTest(unittest.TestCase):
+    def test_uses_server_retry_delay(self):
+        error = _api_error(429, "details: [{'retryDelay': '7s'}]")
+        self.assertEqual(retry_delay(error, 0), 7.0)
+
+    def test_server_retry_delay_is_capped(self):
+        error = _api_error(429, "details: [{'retryDelay': '3600s'}]")
+        self.assertEqual(retry_delay(error, 0), BACKOFF_CAP_SECONDS)
+
+    def test_uses_retry_after_header(self):
+        error = ValueError("busy")
+        error.response = mock.Mock(headers={"retry-after": "4"})
+        self.assertEqual(retry_delay(error, 0), 4.0)
+
+    def test_exponential_backoff_with_jitter(self):
+        with mock.patch("forgeoagent.clients.gemini.gemini_retry.random.uniform", return_value=1.0):
+            self.assertEqual([retry_delay(ValueError(), retry, base=1.0, cap=5.0) for retry in range(5)], [1.0, 2.0, 4.0, 5.0, 5.0])
+        for _ in range(20):
+            self.assertTrue(0.75 <= retry_delay(ValueError(), 0, base=1.0) <= 1.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from forgeoagent.clients.gemini import gemini_response_cache
+from forgeoagent.clients.gemini.gemini_response_cache import GeminiResponseCache
+
+
+class _FakeEmbedClient:
+    """Embeds every prompt to the same vector, so any cached prompt is a semantic match."""
+
+    def __init__(self):
+        self.models = self
+
+    def embed_content(self, model, contents):
+        return SimpleNamespace(embeddings=[SimpleNamespace(values=[1.0, 0.0])])
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(gemini_response_cache, "RESPONSE_CACHE_DIR", self._tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+        self.cache = GeminiResponseCache("test")
+        self.client = _FakeEmbedClient()
+
+    def test_exact_hit(self):
+        self.cache.store("list files in /a", {"python": "print(1)"}, [1.0, 0.0])
+        self.assertEqual(self.cache.lookup("list files in /a", self.client)[0], {"python": "print(1)"})
+
+    def test_semantic_hit_without_code(self):
+        self.cache.store("what is 2 + 2", {"response": "4", "python": ""}, [1.0, 0.0])
+        response, _ = self.cache.lookup("what is 2+2?", self.client)
+        self.assertEqual(response, {"response": "4", "python": ""})
+
+    def test_code_is_never_served_for_a_similar_prompt(self):
+        self.cache.store("delete /tmp/a.txt", {"python": "os.remove('/tmp/a.txt')"}, [1.0, 0.0])
+        response, embedding = self.cache.lookup("delete /tmp/b.txt", self.client)
+        self.assertIsNone(response)
+        self.assertEqual(embedding, [1.0, 0.0])
+
+    def test_lookup_returns_a_copy(self):
+        self.cache.store("prompt", {"ids": ["a"]}, [1.0, 0.0])
+        self.cache.lookup("prompt")[0]["ids"].append("b")
+        self.assertEqual(self.cache.lookup("prompt")[0], {"ids": ["a"]})
+
+    def test_storing_a_key_again_replaces_its_vector(self):
+        for _ in range(3):
+            self.cache.store("prompt", {"response": "x"}, [1.0, 0.0])
+        self.assertEqual(len(self.cache._vectors), 1)
+
+    def test_reload_skips_code_vectors(self):
+        self.cache.store("code", {"python": "print(1)"}, [1.0, 0.0])
+        self.cache.store("text", {"response": "x"}, [0.0, 1.0])
+        reloaded = GeminiResponseCache("test")
+        self.assertEqual([key for _, key in reloaded._vectors], [GeminiResponseCache._key("text")])
+        self.assertEqual(reloaded.lookup("code")[0], {"python": "print(1)"})
+
+
+if __name__ == "__main__":
+    unittest.main()